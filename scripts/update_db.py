@@ -15,7 +15,7 @@ Options:
 Exit Codes:
     0   Success
     1   General error
-    2   Already running (lockfile exists)
+    2   Already running (lockfile held by another run)
     3   Authentication error (Enodia cookie invalid)
 """
 
@@ -23,17 +23,42 @@ import argparse
 import atexit
 import fcntl
 import logging
+import json
+import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
 from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import orjson
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from crawlify.config import load_config
-from crawlify.db import DbConfig, connect, init_db, upsert_vorgang, upsert_drucksache, upsert_drucksache_text
+from crawlify.db import (
+    BackgroundWriter,
+    DbConfig,
+    connect,
+    get_max_aktualisiert,
+    init_db,
+    load_http_cache,
+    save_http_cache,
+    upsert_drucksache_many,
+    upsert_drucksache_text_many,
+)
 from crawlify.dip_client import DipClient, EmptyResponseError, write_page_raw
 from crawlify.ingest import ingest_vorgang_kleine_anfrage
-from crawlify.normalize import normalize_vorgang, normalize_drucksache, normalize_drucksache_text
+from crawlify.normalize import (
+    normalize_drucksache,
+    normalize_drucksache_text,
+    normalize_vorgang,
+    now_iso,
+)
 from crawlify.progress import FetchProgress
 from crawlify.storage import CursorState, load_cursor_state, save_cursor_state
 
@@ -44,6 +69,24 @@ DB_PATH = BASE_DIR / "data" / "db" / "crawlify.sqlite"
 STATE_PATH = BASE_DIR / "state" / "vorgang_cursor.json"
 LOCK_PATH = BASE_DIR / "state" / "update_db.lock"
 
+# Drucksache types listed (concurrently) to find a vorgang's documents
+DRUCKSACHE_DOC_TYPES = ("Kleine Anfrage", "Antwort")
+
+# Parallel HTTP requests for the drucksache text fetch
+DEFAULT_CONCURRENCY = 20
+
+# Drucksache IDs per drucksache-text request (repeated f.id filter)
+TEXT_CHUNK_SIZE = 50
+
+# How far before the oldest target vorgang to look for its drucksachen
+DRUCKSACHE_LOOKBACK_DAYS = 180
+
+# Fetched texts are written in batches of this size (one commit each)
+TEXT_BATCH_SIZE = 100
+
+# Saved DIP cursors older than this are replaced by an aktualisiert filter
+CURSOR_MAX_AGE = timedelta(hours=12)
+
 # Configure logging
 LOG_DIR = BASE_DIR / "logs"
 LOG_DIR.mkdir(parents=True, exist_ok=True)
@@ -60,43 +103,72 @@ logger = logging.getLogger(__name__)
 
 
 class LockFile:
-    """Context manager for file-based locking to prevent concurrent runs."""
-    
+    """Context manager for a lockfile to prevent concurrent runs.
+
+    Held with an exclusive flock(2) on the open file, so the kernel releases
+    it when the holder exits or dies: no stale-lock detection, and no window
+    in which a lock exists without an owner. The file stays in place (it
+    only carries the holder's PID for humans); unlinking it would let a
+    second process lock a fresh inode while the first still holds the old one.
+    """
+
     def __init__(self, lock_path: Path):
         self.lock_path = lock_path
         self.lock_file = None
-    
+
     def __enter__(self):
         self.lock_path.parent.mkdir(parents=True, exist_ok=True)
-        self.lock_file = open(self.lock_path, 'w')
+        lock_file = open(self.lock_path, "a+")
         try:
-            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-            self.lock_file.write(str(sys.argv))
-            self.lock_file.flush()
-            return self
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
         except BlockingIOError:
-            self.lock_file.close()
+            lock_file.close()
             raise RuntimeError("Another instance is already running")
-    
+        lock_file.truncate(0)
+        lock_file.write(f"{os.getpid()}\n")
+        lock_file.flush()
+        self.lock_file = lock_file
+        return self
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.lock_file:
-            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
+            # Closing the descriptor releases the flock
             self.lock_file.close()
-            try:
-                self.lock_path.unlink()
-            except FileNotFoundError:
-                pass
+            self.lock_file = None
 
 
-def fetch_and_normalize_vorgaenge(client: DipClient, conn, raw_dir: Path, state_path: Path) -> int:
-    """Fetch new vorgänge and normalize them into the database."""
+def _cursor_is_fresh(state: CursorState) -> bool:
+    """DIP cursors go stale; only trust ones saved within CURSOR_MAX_AGE."""
+    if not state.cursor or not state.saved_at:
+        return False
+    try:
+        saved_at = datetime.fromisoformat(state.saved_at)
+    except ValueError:
+        return False
+    return datetime.now(timezone.utc) - saved_at < CURSOR_MAX_AGE
+
+
+def fetch_and_normalize_vorgaenge(
+    client: DipClient, conn, raw_dir: Path, state_path: Path, deadline: Optional[float] = None
+) -> int:
+    """Fetch new vorgänge and normalize them into the database.
+
+    Stops early, with the cursor saved, once another page would run past
+    `deadline` (epoch seconds).
+    """
     logger.info("=== 1. Fetching new Vorgänge ===")
 
     state = load_cursor_state(state_path)
-    cursor = state.cursor
+    cursor = state.cursor if _cursor_is_fresh(state) else None
+    # A resumed cursor keeps the filter it was issued for
+    since = state.since if cursor else get_max_aktualisiert(conn)
 
     if cursor:
         logger.info(f"Resuming from cursor: {cursor[:50]}...")
+        if since:
+            logger.info(f"  with aktualisiert >= {since}")
+    elif since:
+        logger.info(f"Resuming from aktualisiert >= {since}")
     else:
         logger.info("Starting fresh (no cursor)")
 
@@ -105,32 +177,46 @@ def fetch_and_normalize_vorgaenge(client: DipClient, conn, raw_dir: Path, state_
     progress = FetchProgress()
 
     try:
-        for page in client.fetch_vorgang_kleine_anfrage_pages(cursor=cursor):
-            # Save raw
-            write_page_raw(page, raw_dir, page_idx, prefix="vorgang")
-
-            # Normalize and upsert
-            for item in page.items:
-                row = normalize_vorgang(item)
-                if row["vorgang_id"] and row["vorgangstyp"]:
-                    upsert_vorgang(conn, row)
-                    total_items += 1
-
-            # Save cursor state
-            save_cursor_state(state_path, CursorState(cursor=page.cursor))
-
-            # Progress tracking
-            total_from_api = page.raw.get("numFound")
-            progress.update(len(page.items), total_from_api)
-            progress.print_status()
+        # Writes run on a background thread while the next page downloads
+        with BackgroundWriter(conn) as writer:
+            for page in client.fetch_vorgang_kleine_anfrage_pages(cursor=cursor, since=since):
+                # Save raw
+                write_page_raw(page, raw_dir, page_idx, prefix="vorgang")
+
+                batch = []
+                updated_at = now_iso()
+                for item in page.items:
+                    row = normalize_vorgang(item, updated_at)
+                    if row["vorgang_id"] and row["vorgangstyp"]:
+                        batch.append(row)
+                writer.put("vorgang", batch)
+                total_items += len(batch)
+
+                # Save cursor state once the page is committed
+                writer.after_commit(partial(
+                    save_cursor_state,
+                    state_path,
+                    CursorState(
+                        cursor=page.cursor,
+                        saved_at=datetime.now(timezone.utc).isoformat(),
+                        since=since,
+                    ),
+                ))
+
+                # Progress tracking
+                total_from_api = page.raw.get("numFound")
+                progress.update(len(page.items), total_from_api)
+                progress.print_status()
 
-            page_idx += 1
+                page_idx += 1
 
-            if not page.cursor:
-                break
+                if not page.cursor:
+                    break
+                if progress.next_page_exceeds(deadline):
+                    logger.info("\nTime budget exhausted, resuming from cursor next run")
+                    break
 
         progress.print_summary()
-        conn.commit()
         logger.info(f"Fetched and normalized {total_items} vorgänge")
         return total_items
 
@@ -145,65 +231,36 @@ def fetch_drucksachen_for_vorgaenge(client: DipClient, conn, vorgang_ids: list)
     logger.info(f"=== 2. Fetching Drucksachen for {len(vorgang_ids)} Vorgänge ===")
 
     target_set = set(str(v) for v in vorgang_ids)
+    datum_start = _drucksache_datum_start(conn, target_set)
     total_saved = 0
     progress = FetchProgress()
 
-    try:
-        for doc_type in ["Kleine Anfrage", "Antwort"]:
-            logger.info(f"  Fetching {doc_type}...")
-
-            url = f"{client.cfg.dip_base_url}/drucksache"
-            params = {
-                "apikey": client.cfg.dip_api_key,
-                "size": "100",
-                "f.drucksachetyp": doc_type
-            }
-
-            # Fetch pages until we've seen all target vorgänge or hit limit
-            found_vorgaenge = set()
-            page_num = 0
-            cursor = None
-
-            while len(found_vorgaenge) < len(target_set) and page_num < 50:
-                if cursor:
-                    params["cursor"] = cursor
-
-                resp = client.session.get(url, params=params, timeout=30)
-                data = resp.json()
-                items = data.get("documents", [])
-                cursor = data.get("cursor")
-                num_found = data.get("numFound", 0)
-
-                # Validate response
-                if not items and num_found > 0:
-                    raise EmptyResponseError(
-                        f"API returned empty documents but numFound={num_found}. "
-                        "Run: crawlify solve-challenge --visible"
-                    )
-
-                for item in items:
-                    vorgangsbezug = item.get("vorgangsbezug", [])
-                    for vb in vorgangsbezug:
-                        vorgang_id = str(vb.get("id", ""))
-                        if vorgang_id in target_set:
-                            row = normalize_drucksache(item, vorgang_id=vorgang_id)
-                            if row["drucksache_id"]:
-                                upsert_drucksache(conn, row)
-                                total_saved += 1
-                                found_vorgaenge.add(vorgang_id)
-                            break
-
-                progress.update(len(items))
-                progress.print_status()
-                print(f" | {doc_type}", end="", flush=True)
+    progress_lock = threading.Lock()
 
-                page_num += 1
-                if not cursor:
-                    break
+    def on_page(doc_type: str, n_items: int) -> None:
+        with progress_lock:
+            progress.update(n_items)
+            progress.print_status(suffix=f" | {doc_type}")
 
-            logger.info(f"\n    Found {len(found_vorgaenge)} vorgänge, saved {total_saved} drucksachen")
+    try:
+        # Both listings are independent, so fetch them concurrently and
+        # write the results from this thread (the connection is not shared).
+        with ThreadPoolExecutor(max_workers=len(DRUCKSACHE_DOC_TYPES)) as pool:
+            futures = {
+                pool.submit(
+                    _fetch_doctype_rows, client, doc_type, target_set, datum_start, on_page
+                ): doc_type
+                for doc_type in DRUCKSACHE_DOC_TYPES
+            }
+            for future in as_completed(futures):
+                doc_type = futures[future]
+                rows, found_vorgaenge = future.result()
+                upsert_drucksache_many(conn, rows)
+                total_saved += len(rows)
+                logger.info(
+                    f"\n    {doc_type}: found {len(found_vorgaenge)} vorgänge, saved {len(rows)} drucksachen"
+                )
 
-        conn.commit()
         return total_saved
 
     except EmptyResponseError as e:
@@ -212,7 +269,97 @@ def fetch_drucksachen_for_vorgaenge(client: DipClient, conn, vorgang_ids: list)
         raise
 
 
-def fetch_drucksachen_per_vorgang(client: DipClient, conn, vorgang_ids: list) -> int:
+def _fetch_doctype_rows(
+    client: DipClient,
+    doc_type: str,
+    target_set: set,
+    datum_start: Optional[str],
+    on_page: Callable[[str, int], None],
+) -> Tuple[list, set]:
+    """List drucksachen of one type and return rows belonging to target_set."""
+    logger.info(f"  Fetching {doc_type}...")
+
+    url = f"{client.cfg.dip_base_url}/drucksache"
+    params = {
+        "apikey": client.cfg.dip_api_key,
+        "size": "100",
+        "f.drucksachetyp": doc_type
+    }
+    if datum_start:
+        # Drucksachen older than the oldest target cannot belong to it;
+        # lets DIP end the listing instead of running into the page cap.
+        params["f.datum.start"] = datum_start
+
+    # Fetch pages until we've seen all target vorgänge or hit limit
+    found_vorgaenge = set()
+    rows = []
+    page_num = 0
+    cursor = None
+
+    while found_vorgaenge != target_set and page_num < 50:
+        request_cursor = cursor
+        if cursor:
+            params["cursor"] = cursor
+
+        client.rate_limiter.acquire()
+        resp = client.session.get(url, params=params, timeout=30)
+        client.rate_limiter.observe(resp.status_code)
+        data = orjson.loads(resp.content)
+        items = data.get("documents", [])
+        cursor = data.get("cursor")
+        num_found = data.get("numFound", 0)
+
+        # Validate response
+        if not items and num_found > 0:
+            raise EmptyResponseError(
+                f"API returned empty documents but numFound={num_found}. "
+                "Run: crawlify solve-challenge --visible"
+            )
+
+        updated_at = now_iso()
+        for item in items:
+            vb_ids = [str(vb.get("id", "")) for vb in item.get("vorgangsbezug", [])]
+            # Most listed drucksachen belong to no target; reject them with one set op
+            if target_set.isdisjoint(vb_ids):
+                continue
+            # Keep the first matching vorgangsbezug, as DIP lists the primary one first
+            vorgang_id = next(v for v in vb_ids if v in target_set)
+            row = normalize_drucksache(item, vorgang_id=vorgang_id, updated_at=updated_at)
+            if row["drucksache_id"]:
+                rows.append(row)
+                found_vorgaenge.add(vorgang_id)
+
+        on_page(doc_type, len(items))
+
+        page_num += 1
+        if not cursor or cursor == request_cursor:
+            break
+
+    return rows, found_vorgaenge
+
+
+def _drucksache_datum_start(conn, vorgang_ids: set) -> Optional[str]:
+    """Earliest date a drucksache of the given vorgänge can have, as YYYY-MM-DD."""
+    if not vorgang_ids:
+        return None
+    # json_each avoids SQLite's bound-parameter limit for --full runs
+    row = conn.execute(
+        "SELECT MIN(datum) FROM vorgang WHERE vorgang_id IN (SELECT value FROM json_each(?))",
+        (json.dumps(sorted(vorgang_ids)),),
+    ).fetchone()
+    if not row or not row[0]:
+        return None
+    try:
+        min_datum = date.fromisoformat(row[0][:10])
+    except ValueError:
+        return None
+    # vorgang.datum tracks the latest activity; the question may predate it
+    return (min_datum - timedelta(days=DRUCKSACHE_LOOKBACK_DAYS)).isoformat()
+
+
+def fetch_drucksachen_per_vorgang(
+    client: DipClient, conn, vorgang_ids: list, deadline: Optional[float] = None
+) -> int:
     """Fetch drucksachen for each vorgang individually (slower but works for old vorgänge)."""
     logger.info(f"=== 2b. Fetching Drucksachen per Vorgang ({len(vorgang_ids)} vorgänge) ===")
 
@@ -220,43 +367,50 @@ def fetch_drucksachen_per_vorgang(client: DipClient, conn, vorgang_ids: list) ->
     progress = FetchProgress(total_expected=len(vorgang_ids))
 
     try:
-        for vorgang_id in vorgang_ids:
-            url = f"{client.cfg.dip_base_url}/drucksache"
-            params = {
-                "apikey": client.cfg.dip_api_key,
-                "f.vorgang": str(vorgang_id),
-            }
+        with BackgroundWriter(conn) as writer:
+            for vorgang_id in vorgang_ids:
+                url = f"{client.cfg.dip_base_url}/drucksache"
+                params = {
+                    "apikey": client.cfg.dip_api_key,
+                    "f.vorgang": str(vorgang_id),
+                }
+
+                try:
+                    client.rate_limiter.acquire()
+                    resp = client.session.get(url, params=params, timeout=30)
+                    client.rate_limiter.observe(resp.status_code)
+                    if resp.status_code == 200:
+                        data = orjson.loads(resp.content)
+                        items = data.get("documents", [])
+                        num_found = data.get("numFound", 0)
+
+                        # Validate response
+                        if not items and num_found > 0:
+                            raise EmptyResponseError(
+                                f"API returned empty documents but numFound={num_found}. "
+                                "Run: crawlify solve-challenge --visible"
+                            )
+
+                        batch = []
+                        for item in items:
+                            row = normalize_drucksache(item, vorgang_id=str(vorgang_id))
+                            if row["drucksache_id"]:
+                                batch.append(row)
+                        writer.put("drucksache", batch)
+                        total_saved += len(batch)
 
-            try:
-                resp = client.session.get(url, params=params, timeout=30)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    items = data.get("documents", [])
-                    num_found = data.get("numFound", 0)
-
-                    # Validate response
-                    if not items and num_found > 0:
-                        raise EmptyResponseError(
-                            f"API returned empty documents but numFound={num_found}. "
-                            "Run: crawlify solve-challenge --visible"
-                        )
-
-                    for item in items:
-                        row = normalize_drucksache(item, vorgang_id=str(vorgang_id))
-                        if row["drucksache_id"]:
-                            upsert_drucksache(conn, row)
-                            total_saved += 1
+                except EmptyResponseError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"  Vorgang {vorgang_id}: Error - {e}")
 
-            except EmptyResponseError:
-                raise
-            except Exception as e:
-                logger.warning(f"  Vorgang {vorgang_id}: Error - {e}")
-
-            progress.update(1)
-            progress.print_status()
+                progress.update(1)
+                progress.print_status()
+                if progress.next_page_exceeds(deadline):
+                    logger.info("\nTime budget exhausted, remaining vorgänge follow next run")
+                    break
 
         progress.print_summary()
-        conn.commit()
         logger.info(f"  Saved {total_saved} drucksachen")
         return total_saved
 
@@ -266,16 +420,38 @@ def fetch_drucksachen_per_vorgang(client: DipClient, conn, vorgang_ids: list) ->
         raise
 
 
-def fetch_drucksache_texts(client: DipClient, conn) -> int:
-    """Fetch full text for drucksachen that don't have it yet."""
+def _chunked(seq: list, size: int) -> list:
+    """Split a list into consecutive chunks of at most `size` elements."""
+    return [seq[i:i + size] for i in range(0, len(seq), size)]
+
+
+def _fetch_text_chunk(client: DipClient, ds_ids: list) -> list:
+    """Fetch the text pages for a chunk of drucksachen. Runs in a worker thread.
+
+    DIP ORs repeated filter parameters, so one query with many f.id values
+    replaces one request per drucksache. An unchanged chunk (304) has no pages.
+    """
+    params = {"f.id": list(ds_ids)}  # Important: use f.id, not f.drucksache!
+    return list(client.fetch_drucksache_text_pages(params))
+
+
+def fetch_drucksache_texts(client: DipClient, conn, concurrency: int = DEFAULT_CONCURRENCY) -> int:
+    """Fetch full text for drucksachen that don't have it yet.
+
+    IDs are queried in chunks of TEXT_CHUNK_SIZE; chunks run concurrently in
+    a thread pool and results are written to SQLite on the calling thread
+    so the connection is never shared.
+    """
     logger.info("=== 3. Fetching Drucksache Texts ===")
 
     # Get drucksachen without text
     rows = conn.execute("""
         SELECT d.drucksache_id
         FROM drucksache d
-        LEFT JOIN drucksache_text dt ON d.drucksache_id = dt.drucksache_id
-        WHERE dt.drucksache_id IS NULL
+        WHERE NOT EXISTS (
+            SELECT 1 FROM drucksache_text dt WHERE dt.drucksache_id = d.drucksache_id
+        )
+        ORDER BY d.drucksache_id
     """).fetchall()
 
     drucksache_ids = [r["drucksache_id"] for r in rows]
@@ -285,47 +461,66 @@ def fetch_drucksache_texts(client: DipClient, conn) -> int:
         return 0
 
     total_saved = 0
+    batch = []
+    # Pages whose validators are recorded once their rows are committed
+    batch_pages = []
     progress = FetchProgress(total_expected=len(drucksache_ids))
+    # Stable (sorted) chunks give stable request keys, so unchanged chunks
+    # come back as 304 Not Modified on reruns
+    client.http_cache = load_http_cache(conn)
+
+    def flush() -> None:
+        nonlocal batch, batch_pages, total_saved
+        upsert_drucksache_text_many(conn, batch)
+        total_saved += len(batch)
+        for page in batch_pages:
+            client.remember_validators(page)
+        batch, batch_pages = [], []
 
     try:
-        for ds_id in drucksache_ids:
-            url = f"{client.cfg.dip_base_url}/drucksache-text"
-            params = {
-                "apikey": client.cfg.dip_api_key,
-                "f.id": ds_id  # Important: use f.id, not f.drucksache!
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {
+                executor.submit(_fetch_text_chunk, client, chunk): chunk
+                for chunk in _chunked(drucksache_ids, TEXT_CHUNK_SIZE)
             }
-
             try:
-                resp = client.session.get(url, params=params, timeout=30)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    num_found = data.get("numFound", 0)
-                    items = data.get("documents", [])
-
-                    # Validate response (only if numFound > 0)
-                    if not items and num_found > 0:
-                        raise EmptyResponseError(
-                            f"API returned empty documents but numFound={num_found}. "
-                            "Run: crawlify solve-challenge --visible"
-                        )
-
-                    if items:
-                        row = normalize_drucksache_text(items[0])
-                        if row["drucksache_id"] and row["volltext"]:
-                            upsert_drucksache_text(conn, row)
-                            total_saved += 1
-                            logger.debug(f"    {ds_id}: {len(row['volltext'])} chars")
-
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    try:
+                        updated_at = now_iso()
+                        for page in future.result():
+                            for item in page.items:
+                                row = normalize_drucksache_text(item, updated_at)
+                                if row["drucksache_id"] and row["volltext"]:
+                                    batch.append(row)
+                                    logger.debug(f"    {row['drucksache_id']}: {len(row['volltext'])} chars")
+                            batch_pages.append(page)
+                        if len(batch) >= TEXT_BATCH_SIZE:
+                            flush()
+
+                    except EmptyResponseError:
+                        raise  # Re-raise auth errors
+                    except Exception as e:
+                        logger.warning(f"    {chunk[0]}..{chunk[-1]}: Error - {e}")
+
+                    progress.update(len(chunk))
+                    progress.print_status()
             except EmptyResponseError:
-                raise  # Re-raise auth errors
-            except Exception as e:
-                logger.warning(f"    {ds_id}: Error - {e}")
-
-            progress.update(1)
-            progress.print_status()
+                for future in futures:
+                    future.cancel()
+                raise
+            finally:
+                # Keep texts fetched so far, even when aborting on auth errors
+                flush()
+                # Chunks are rebuilt from the ids still lacking text, so keys
+                # not requested this run will never repeat: keep only live ones
+                save_http_cache(conn, {
+                    key: validators
+                    for key, validators in client.http_cache.items()
+                    if key in client.live_cache_keys
+                })
 
         progress.print_summary()
-        conn.commit()
         logger.info(f"  Saved {total_saved} texts")
         return total_saved
 
@@ -340,20 +535,33 @@ def get_vorgaenge_without_drucksachen(conn, limit: int) -> list:
     rows = conn.execute("""
         SELECT v.vorgang_id
         FROM vorgang v
-        LEFT JOIN drucksache d ON v.vorgang_id = d.vorgang_id
-        WHERE d.drucksache_id IS NULL
+        WHERE NOT EXISTS (
+            SELECT 1 FROM drucksache d WHERE d.vorgang_id = v.vorgang_id
+        )
         ORDER BY v.datum DESC
         LIMIT ?
     """, (limit,)).fetchall()
     return [r["vorgang_id"] for r in rows]
 
 
+def _out_of_time(deadline: Optional[float]) -> bool:
+    if deadline is not None and time.time() >= deadline:
+        logger.info("Time budget exhausted, skipping remaining stages")
+        return True
+    return False
+
+
 def log_summary(conn):
     """Log database summary."""
     logger.info("=== Datenbank-Übersicht ===")
-    for table in ["vorgang", "drucksache", "drucksache_text"]:
-        count = conn.execute(f"SELECT COUNT(*) as c FROM {table}").fetchone()["c"]
-        logger.info(f"  {table}: {count}")
+    row = conn.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM vorgang) AS vorgang,
+            (SELECT COUNT(*) FROM drucksache) AS drucksache,
+            (SELECT COUNT(*) FROM drucksache_text) AS drucksache_text
+    """).fetchone()
+    for table in row.keys():
+        logger.info(f"  {table}: {row[table]}")
 
 
 def main() -> int:
@@ -365,12 +573,16 @@ def main() -> int:
     parser.add_argument("--skip-drucksache", action="store_true", help="Skip drucksache fetch")
     parser.add_argument("--skip-text", action="store_true", help="Skip text fetch")
     parser.add_argument("--per-vorgang", action="store_true", help="Fetch drucksachen per vorgang (slower, but works for old vorgänge)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Parallel requests for text fetch")
+    parser.add_argument("--budget-seconds", type=float, default=None, help="Stop fetching once this wall-clock budget would be exceeded")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable debug logging")
     args = parser.parse_args()
 
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
+    deadline = time.time() + args.budget_seconds if args.budget_seconds else None
+
     try:
         with LockFile(LOCK_PATH):
             logger.info("=" * 50)
@@ -385,17 +597,18 @@ def main() -> int:
             DB_PATH.parent.mkdir(parents=True, exist_ok=True)
             STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-            conn = connect(DbConfig(path=DB_PATH))
+            # Shared with the BackgroundWriter thread during fetch stages
+            conn = connect(DbConfig(path=DB_PATH), check_same_thread=False)
             init_db(conn)
 
             log_summary(conn)
 
             # 1. Fetch and normalize vorgänge
             if not args.skip_vorgang:
-                fetch_and_normalize_vorgaenge(client, conn, RAW_DIR, STATE_PATH)
+                fetch_and_normalize_vorgaenge(client, conn, RAW_DIR, STATE_PATH, deadline=deadline)
 
             # 2. Fetch drucksachen
-            if not args.skip_drucksache:
+            if not args.skip_drucksache and not _out_of_time(deadline):
                 if args.full:
                     vorgang_ids = [r["vorgang_id"] for r in conn.execute(
                         "SELECT vorgang_id FROM vorgang"
@@ -405,15 +618,15 @@ def main() -> int:
 
                 if vorgang_ids:
                     if args.per_vorgang:
-                        fetch_drucksachen_per_vorgang(client, conn, vorgang_ids)
+                        fetch_drucksachen_per_vorgang(client, conn, vorgang_ids, deadline=deadline)
                     else:
                         fetch_drucksachen_for_vorgaenge(client, conn, vorgang_ids)
                 else:
                     logger.info("=== 2. No new vorgänge need drucksachen ===")
 
             # 3. Fetch texts
-            if not args.skip_text:
-                fetch_drucksache_texts(client, conn)
+            if not args.skip_text and not _out_of_time(deadline):
+                fetch_drucksache_texts(client, conn, concurrency=args.concurrency)
 
             logger.info("=" * 50)
             logger.info("Update complete!")
@@ -1,18 +1,246 @@
 """Admin service for database visualization."""
-import json
+import os
+import queue
+import re
 import sqlite3
-from typing import List, Dict, Any, Optional
-from config import DB_PATH
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Tuple
+
+import orjson
+
+from config import ADMIN_PAGE_CACHE_TTL_S, ADMIN_STATS_TTL_S, DB_PATH
+
+# Pooled read connections. The admin endpoints are sync, so FastAPI runs
+# them on its threadpool (40 threads by default); at most POOL_SIZE readers
+# hold a connection at once and further requests wait for one
+POOL_SIZE = min(os.cpu_count() or 1, 8)
+
+# Runs independent admin queries concurrently, one pooled connection each
+_QUERY_EXECUTOR = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="admin-query")
+
+OVERVIEW_QUERIES = {
+    # Plain counts share one statement; the embedding count walks the
+    # partial index idx_vorgang_has_embedding instead of the table rows.
+    # Texts count only for known drucksachen (foreign keys are not enforced)
+    "totals": """
+        SELECT (SELECT COUNT(*) FROM vorgang),
+               (SELECT COUNT(*) FROM drucksache),
+               (SELECT COUNT(*) FROM drucksache_text
+                WHERE drucksache_id IN (SELECT drucksache_id FROM drucksache)),
+               (SELECT COUNT(*) FROM vorgang WHERE embedding_json IS NOT NULL)
+    """,
+    "by_ressort": """
+        SELECT ressort, COUNT(*) as cnt FROM vorgang
+        GROUP BY ressort ORDER BY cnt DESC
+    """,
+    "by_status": """
+        SELECT beratungsstand, COUNT(*) as cnt FROM vorgang
+        GROUP BY beratungsstand ORDER BY cnt DESC
+    """,
+    "by_year": """
+        SELECT substr(datum, 1, 4) as year, COUNT(*) as cnt
+        FROM vorgang
+        WHERE datum IS NOT NULL
+        GROUP BY year ORDER BY year DESC
+    """,
+    "drucksache_types": """
+        SELECT drucksachetyp, COUNT(*) as cnt FROM drucksache
+        GROUP BY drucksachetyp ORDER BY cnt DESC
+    """,
+    "recent_vorgaenge": """
+        SELECT vorgang_id, titel, datum, updated_at
+        FROM vorgang ORDER BY updated_at DESC LIMIT 10
+    """,
+}
+
+# Pooled connections return plain tuples; dicts are built against these
+# precomputed keys (list pages are assembled as JSON by SQLite instead)
+RECENT_VORGANG_KEYS = ("vorgang_id", "titel", "datum", "updated_at")
+DRUCKSACHE_TEXT_KEYS = ("drucksache_id", "volltext", "text_format", "updated_at")
+
+VORGANG_SORT_COLUMNS = ("vorgang_id", "titel", "datum", "ressort", "beratungsstand", "updated_at")
+
+# Heavy Vorgang columns left out of the list view unless requested:
+# field name -> (source column, JSON expression)
+VORGANG_DETAIL_FIELDS = {
+    "abstrakt": ("abstrakt", "abstrakt"),
+    "initiatoren": ("initiatoren_json", "json(NULLIF(initiatoren_json, ''))"),
+    "schlagworte": ("schlagworte_json", "json(NULLIF(schlagworte_json, ''))"),
+}
+
+# Covers every summary list query shape below, so each one is prepared once
+# per pooled connection and then reused from sqlite3's statement cache
+STATEMENT_CACHE_SIZE = 256
+
+# Unfiltered-by-search list pages kept for Prev/Next navigation
+PAGE_CACHE_SIZE = 256
+
+# Rows fetched per step when streaming ad-hoc admin query results
+QUERY_FETCH_SIZE = 256
+
+# Authorizer actions an ad-hoc admin query may use; anything else (writes,
+# DDL, PRAGMA, ATTACH, transactions) is rejected by SQLite at prepare time
+_READ_ONLY_ACTIONS = frozenset({
+    sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE,
+})
+
+_LIMIT_RE = re.compile(r"\blimit\b", re.IGNORECASE)
+
+
+def _read_only_authorizer(action: int, arg1: Optional[str], *_: Any) -> int:
+    if action in _READ_ONLY_ACTIONS:
+        return sqlite3.SQLITE_OK
+    # Virtual tables (FTS5, json_each) register themselves in the schema
+    # and FTS5 polls data_version; SQLite refuses user writes to
+    # sqlite_master on its own
+    if action == sqlite3.SQLITE_UPDATE and arg1 == "sqlite_master":
+        return sqlite3.SQLITE_OK
+    if action == sqlite3.SQLITE_PRAGMA and arg1 == "data_version":
+        return sqlite3.SQLITE_OK
+    return sqlite3.SQLITE_DENY
+
+
+@lru_cache(maxsize=None)
+def _vorgaenge_sql(
+    has_ressort: bool,
+    has_status: bool,
+    search_mode: Optional[str],
+    sort_by: str,
+    sort_dir: str,
+    fields: Tuple[str, ...] = (),
+) -> Tuple[str, str]:
+    """Count and page SQL for one filter/sort combination (144 shapes per field set).
+
+    search_mode is None, "fts" (one MATCH parameter) or "like" (two LIKE parameters).
+    fields are keys of VORGANG_DETAIL_FIELDS added to the summary columns.
+    """
+    where_clauses = []
+    if has_ressort:
+        where_clauses.append("ressort = ?")
+    if has_status:
+        where_clauses.append("beratungsstand = ?")
+    if search_mode == "fts":
+        where_clauses.append("rowid IN (SELECT rowid FROM vorgang_fts WHERE vorgang_fts MATCH ?)")
+    elif search_mode == "like":
+        where_clauses.append("(titel LIKE ? OR abstrakt LIKE ?)")
+    where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+
+    count_sql = f"SELECT COUNT(*) FROM vorgang {where_sql}"
+    # SQLite builds the whole page as one JSON array (JSON1), so the
+    # JSON columns are embedded as-is instead of parsed per row in Python
+    detail_sql = "".join(
+        f", '{name}', {VORGANG_DETAIL_FIELDS[name][1]}" for name in fields
+    )
+    detail_columns = "".join(f", {VORGANG_DETAIL_FIELDS[name][0]}" for name in fields)
+    query = f"""
+        SELECT json_group_array(json_object(
+            'vorgang_id', vorgang_id, 'vorgangstyp', vorgangstyp, 'titel', titel,
+            'datum', datum, 'beratungsstand', beratungsstand,
+            'legislature', legislature, 'ressort', ressort,
+            'embedding_version', embedding_version, 'updated_at', updated_at{detail_sql}
+        ))
+        FROM (
+            SELECT vorgang_id, vorgangstyp, titel, datum, beratungsstand, legislature,
+                   ressort, embedding_version, updated_at{detail_columns}
+            FROM vorgang
+            {where_sql}
+            ORDER BY {sort_by} {sort_dir}
+            LIMIT ? OFFSET ?
+        )
+    """
+    return count_sql, query
+
+
+def _fts_phrase(text: str) -> str:
+    """Quote user input as one FTS5 phrase (no query syntax)."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+@lru_cache(maxsize=None)
+def _drucksachen_sql(has_vorgang: bool) -> Tuple[str, str]:
+    """Count and page SQL for the Drucksachen list, optionally per Vorgang."""
+    where_sql = "WHERE d.vorgang_id = ?" if has_vorgang else ""
+    count_sql = f"SELECT COUNT(*) FROM drucksache d {where_sql}"
+    query = f"""
+        SELECT json_group_array(json_object(
+            'drucksache_id', drucksache_id, 'vorgang_id', vorgang_id, 'titel', titel,
+            'drucksachetyp', drucksachetyp, 'drucksache_nummer', drucksache_nummer,
+            'datum', datum, 'dok_url', dok_url, 'dokument_typ', dokument_typ,
+            'updated_at', updated_at, 'has_text', has_text, 'text_length', text_length
+        ))
+        FROM (
+            SELECT d.drucksache_id, d.vorgang_id, d.titel, d.drucksachetyp,
+                   d.drucksache_nummer, d.datum, d.dok_url, d.dokument_typ, d.updated_at,
+                   CASE WHEN dt.volltext IS NOT NULL THEN 1 ELSE 0 END as has_text,
+                   LENGTH(dt.volltext) as text_length
+            FROM drucksache d
+            LEFT JOIN drucksache_text dt ON d.drucksache_id = dt.drucksache_id
+            {where_sql}
+            ORDER BY d.datum DESC
+            LIMIT ? OFFSET ?
+        )
+    """
+    return count_sql, query
 
 
 class AdminService:
     """Service for admin database operations."""
 
-    def _get_connection(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(str(DB_PATH))
-        conn.row_factory = sqlite3.Row
+    def __init__(self, pool_size: int = POOL_SIZE):
+        # Connections are opened lazily (the DB may not exist at import)
+        # and reused across requests instead of reopened per call.
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=pool_size)
+        self._pool_size = pool_size
+        self._opened = 0
+        self._lock = threading.Lock()
+        # (monotonic timestamp, payload) of the last overview computation
+        self._stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._stats_lock = threading.Lock()
+        # list page key -> (monotonic timestamp, payload), least recent first
+        self._page_cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._page_cache_generation = 0
+        self._page_lock = threading.Lock()
+        self._fts_available = False
+
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            str(DB_PATH), check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
         return conn
 
+    @contextmanager
+    def _conn(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self._pool_size
+                if can_open:
+                    self._opened += 1
+            if not can_open:
+                conn = self._pool.get()
+            else:
+                try:
+                    conn = self._open_connection()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
     def get_vorgaenge(
         self,
         limit: int = 50,
@@ -21,72 +249,76 @@ class AdminService:
         sort_order: str = "desc",
         filter_ressort: Optional[str] = None,
         filter_status: Optional[str] = None,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None
     ) -> Dict[str, Any]:
-        """Get paginated list of Vorgaenge."""
-        conn = self._get_connection()
+        """Get paginated list of Vorgaenge.
 
-        # Build query
-        where_clauses = []
+        Only summary columns are returned; names from VORGANG_DETAIL_FIELDS in
+        ``fields`` opt into the heavier ones (unknown names are ignored).
+        """
+        detail_fields = tuple(
+            name for name in VORGANG_DETAIL_FIELDS if fields and name in fields
+        )
         params = []
-
         if filter_ressort:
-            where_clauses.append("ressort = ?")
             params.append(filter_ressort)
-
         if filter_status:
-            where_clauses.append("beratungsstand = ?")
             params.append(filter_status)
 
-        if search:
-            where_clauses.append("(titel LIKE ? OR abstrakt LIKE ?)")
-            params.extend([f"%{search}%", f"%{search}%"])
-
-        where_sql = ""
-        if where_clauses:
-            where_sql = "WHERE " + " AND ".join(where_clauses)
-
         # Validate sort column
-        allowed_sort = ["vorgang_id", "titel", "datum", "ressort", "beratungsstand", "updated_at"]
-        if sort_by not in allowed_sort:
+        if sort_by not in VORGANG_SORT_COLUMNS:
             sort_by = "datum"
         sort_dir = "DESC" if sort_order.lower() == "desc" else "ASC"
 
-        # Count total
-        count_sql = f"SELECT COUNT(*) FROM vorgang {where_sql}"
-        total = conn.execute(count_sql, params).fetchone()[0]
+        def page(
+            conn: sqlite3.Connection, search_mode: Optional[str], search_params: List[str]
+        ) -> Dict[str, Any]:
+            count_sql, query = _vorgaenge_sql(
+                bool(filter_ressort), bool(filter_status), search_mode, sort_by, sort_dir,
+                detail_fields,
+            )
+            total = conn.execute(count_sql, params + search_params).fetchone()[0]
+            items = orjson.loads(
+                conn.execute(query, params + search_params + [limit, offset]).fetchone()[0]
+            )
+            return {
+                "items": items,
+                "total": total,
+                "limit": limit,
+                "offset": offset,
+                "pages": (total + limit - 1) // limit
+            }
 
-        # Get data
-        query = f"""
-            SELECT vorgang_id, vorgangstyp, titel, datum, beratungsstand,
-                   legislature, ressort, abstrakt, initiatoren_json, schlagworte_json,
-                   embedding_version, updated_at
-            FROM vorgang
-            {where_sql}
-            ORDER BY {sort_by} {sort_dir}
-            LIMIT ? OFFSET ?
-        """
-        params.extend([limit, offset])
-
-        rows = conn.execute(query, params).fetchall()
-        conn.close()
-
-        items = []
-        for row in rows:
-            item = dict(row)
-            item["initiatoren"] = json.loads(item["initiatoren_json"]) if item["initiatoren_json"] else None
-            item["schlagworte"] = json.loads(item["schlagworte_json"]) if item["schlagworte_json"] else None
-            del item["initiatoren_json"]
-            del item["schlagworte_json"]
-            items.append(item)
-
-        return {
-            "items": items,
-            "total": total,
-            "limit": limit,
-            "offset": offset,
-            "pages": (total + limit - 1) // limit
-        }
+        if not search:
+            def load() -> Dict[str, Any]:
+                with self._conn() as conn:
+                    return page(conn, None, [])
+
+            key = (
+                "vorgaenge", filter_ressort, filter_status, sort_by, sort_dir, detail_fields,
+                limit, offset,
+            )
+            return self._cached_page(key, load)
+
+        # Search terms are too varied to be worth caching
+        with self._conn() as conn:
+            # Substring search via the trigram FTS index; it needs at least
+            # three characters, so shorter terms (or no index) use LIKE
+            if len(search) >= 3 and self._has_fts(conn):
+                try:
+                    return page(conn, "fts", [_fts_phrase(search)])
+                except sqlite3.OperationalError:
+                    pass
+            return page(conn, "like", [f"%{search}%", f"%{search}%"])
+
+    def _has_fts(self, conn: sqlite3.Connection) -> bool:
+        # The index is created by the crawler's init_db; remember once seen
+        if not self._fts_available:
+            self._fts_available = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vorgang_fts'"
+            ).fetchone() is not None
+        return self._fts_available
 
     def get_drucksachen(
         self,
@@ -95,160 +327,175 @@ class AdminService:
         vorgang_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Get paginated list of Drucksachen."""
-        conn = self._get_connection()
+        params = [vorgang_id] if vorgang_id else []
+        count_sql, query = _drucksachen_sql(bool(vorgang_id))
 
-        where_sql = ""
-        params = []
-        if vorgang_id:
-            where_sql = "WHERE d.vorgang_id = ?"
-            params.append(vorgang_id)
+        def load() -> Dict[str, Any]:
+            with self._conn() as conn:
+                total = conn.execute(count_sql, params).fetchone()[0]
+                items = orjson.loads(conn.execute(query, params + [limit, offset]).fetchone()[0])
 
-        count_sql = f"SELECT COUNT(*) FROM drucksache d {where_sql}"
-        total = conn.execute(count_sql, params).fetchone()[0]
-
-        query = f"""
-            SELECT d.drucksache_id, d.vorgang_id, d.titel, d.drucksachetyp,
-                   d.drucksache_nummer, d.datum, d.dok_url, d.dokument_typ, d.updated_at,
-                   CASE WHEN dt.volltext IS NOT NULL THEN 1 ELSE 0 END as has_text,
-                   LENGTH(dt.volltext) as text_length
-            FROM drucksache d
-            LEFT JOIN drucksache_text dt ON d.drucksache_id = dt.drucksache_id
-            {where_sql}
-            ORDER BY d.datum DESC
-            LIMIT ? OFFSET ?
-        """
-        params.extend([limit, offset])
-
-        rows = conn.execute(query, params).fetchall()
-        conn.close()
+            return {
+                "items": items,
+                "total": total,
+                "limit": limit,
+                "offset": offset,
+                "pages": (total + limit - 1) // limit
+            }
 
-        return {
-            "items": [dict(row) for row in rows],
-            "total": total,
-            "limit": limit,
-            "offset": offset,
-            "pages": (total + limit - 1) // limit
-        }
+        return self._cached_page(("drucksachen", vorgang_id, limit, offset), load)
+
+    def _cached_page(self, key: Tuple, load: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return a list page from the LRU if younger than ADMIN_PAGE_CACHE_TTL_S."""
+        with self._page_lock:
+            hit = self._page_cache.get(key)
+            if hit and time.monotonic() - hit[0] < ADMIN_PAGE_CACHE_TTL_S:
+                self._page_cache.move_to_end(key)
+                return hit[1]
+            generation = self._page_cache_generation
+        result = load()
+        with self._page_lock:
+            # Don't store a page loaded before an invalidation
+            if generation == self._page_cache_generation:
+                self._page_cache[key] = (time.monotonic(), result)
+                self._page_cache.move_to_end(key)
+                while len(self._page_cache) > PAGE_CACHE_SIZE:
+                    self._page_cache.popitem(last=False)
+        return result
+
+    def invalidate_pagination_cache(self) -> None:
+        """Drop cached list pages, e.g. after the database was updated."""
+        with self._page_lock:
+            self._page_cache.clear()
+            self._page_cache_generation += 1
 
     def get_drucksache_text(self, drucksache_id: str) -> Optional[Dict[str, Any]]:
         """Get full text of a Drucksache."""
-        conn = self._get_connection()
-        row = conn.execute("""
-            SELECT drucksache_id, volltext, text_format, updated_at
-            FROM drucksache_text
-            WHERE drucksache_id = ?
-        """, (drucksache_id,)).fetchone()
-        conn.close()
+        with self._conn() as conn:
+            row = conn.execute("""
+                SELECT drucksache_id, volltext, text_format, updated_at
+                FROM drucksache_text
+                WHERE drucksache_id = ?
+            """, (drucksache_id,)).fetchone()
 
         if not row:
             return None
-        return dict(row)
+        return dict(zip(DRUCKSACHE_TEXT_KEYS, row))
 
     def get_overview_stats(self) -> Dict[str, Any]:
-        """Get detailed database statistics for admin."""
-        conn = self._get_connection()
+        """Get detailed database statistics for admin (cached for ADMIN_STATS_TTL_S)."""
+        cached = self._stats_cache
+        if cached and time.monotonic() - cached[0] < ADMIN_STATS_TTL_S:
+            return cached[1]
+        # One recompute at a time; concurrent callers reuse its result
+        with self._stats_lock:
+            cached = self._stats_cache
+            if cached and time.monotonic() - cached[0] < ADMIN_STATS_TTL_S:
+                return cached[1]
+            stats = self._compute_overview_stats()
+            self._stats_cache = (time.monotonic(), stats)
+            return stats
+
+    def invalidate_stats_cache(self) -> None:
+        """Drop the cached overview, e.g. after the database was updated."""
+        self._stats_cache = None
+
+    def _compute_overview_stats(self) -> Dict[str, Any]:
+        # The aggregates are independent, so they run concurrently on pooled
+        # connections (WAL allows parallel readers).
+        futures = {
+            name: _QUERY_EXECUTOR.submit(self._fetch_all, sql)
+            for name, sql in OVERVIEW_QUERIES.items()
+        }
+        results = {name: future.result() for name, future in futures.items()}
 
         stats = {}
 
         # Basic counts
-        stats["vorgaenge_total"] = conn.execute("SELECT COUNT(*) FROM vorgang").fetchone()[0]
-        stats["drucksachen_total"] = conn.execute("SELECT COUNT(*) FROM drucksache").fetchone()[0]
-        stats["drucksache_texts_total"] = conn.execute("SELECT COUNT(*) FROM drucksache_text").fetchone()[0]
+        (
+            stats["vorgaenge_total"],
+            stats["drucksachen_total"],
+            stats["drucksache_texts_total"],
+            stats["with_embeddings"],
+        ) = results["totals"][0]
 
         # Embedding stats
-        stats["with_embeddings"] = conn.execute(
-            "SELECT COUNT(*) FROM vorgang WHERE embedding_json IS NOT NULL"
-        ).fetchone()[0]
         stats["without_embeddings"] = stats["vorgaenge_total"] - stats["with_embeddings"]
 
         # By ressort
         stats["by_ressort"] = [
-            {"name": r[0] or "Unbekannt", "count": r[1]}
-            for r in conn.execute("""
-                SELECT ressort, COUNT(*) as cnt FROM vorgang
-                GROUP BY ressort ORDER BY cnt DESC
-            """).fetchall()
+            {"name": r[0] or "Unbekannt", "count": r[1]} for r in results["by_ressort"]
         ]
 
         # By status
         stats["by_status"] = [
-            {"name": b[0] or "Unbekannt", "count": b[1]}
-            for b in conn.execute("""
-                SELECT beratungsstand, COUNT(*) as cnt FROM vorgang
-                GROUP BY beratungsstand ORDER BY cnt DESC
-            """).fetchall()
+            {"name": b[0] or "Unbekannt", "count": b[1]} for b in results["by_status"]
         ]
 
         # By year
-        stats["by_year"] = [
-            {"year": y[0], "count": y[1]}
-            for y in conn.execute("""
-                SELECT substr(datum, 1, 4) as year, COUNT(*) as cnt
-                FROM vorgang
-                WHERE datum IS NOT NULL
-                GROUP BY year ORDER BY year DESC
-            """).fetchall()
-        ]
+        stats["by_year"] = [{"year": y[0], "count": y[1]} for y in results["by_year"]]
 
         # Drucksache types
         stats["drucksache_types"] = [
-            {"type": d[0] or "Unbekannt", "count": d[1]}
-            for d in conn.execute("""
-                SELECT drucksachetyp, COUNT(*) as cnt FROM drucksache
-                GROUP BY drucksachetyp ORDER BY cnt DESC
-            """).fetchall()
+            {"type": d[0] or "Unbekannt", "count": d[1]} for d in results["drucksache_types"]
         ]
 
-        # Text coverage
+        # Text coverage; the totals query only counts texts of known
+        # drucksachen, so orphaned rows can't push without_text below zero
+        with_text = stats["drucksache_texts_total"]
         stats["text_coverage"] = {
-            "with_text": conn.execute("""
-                SELECT COUNT(DISTINCT d.drucksache_id)
-                FROM drucksache d
-                INNER JOIN drucksache_text dt ON d.drucksache_id = dt.drucksache_id
-            """).fetchone()[0],
-            "without_text": stats["drucksachen_total"] - conn.execute("""
-                SELECT COUNT(DISTINCT d.drucksache_id)
-                FROM drucksache d
-                INNER JOIN drucksache_text dt ON d.drucksache_id = dt.drucksache_id
-            """).fetchone()[0]
+            "with_text": with_text,
+            "without_text": stats["drucksachen_total"] - with_text,
         }
 
         # Recent updates
         stats["recent_vorgaenge"] = [
-            dict(r) for r in conn.execute("""
-                SELECT vorgang_id, titel, datum, updated_at
-                FROM vorgang ORDER BY updated_at DESC LIMIT 10
-            """).fetchall()
+            dict(zip(RECENT_VORGANG_KEYS, r)) for r in results["recent_vorgaenge"]
         ]
 
-        conn.close()
         return stats
 
+    def _fetch_all(self, sql: str) -> List[Tuple]:
+        with self._conn() as conn:
+            return conn.execute(sql).fetchall()
+
+    @contextmanager
+    def _read_only(self, conn: sqlite3.Connection) -> Iterator[None]:
+        # Enforced by SQLite itself, so e.g. CTEs are allowed while writes
+        # hidden anywhere in the statement are refused
+        conn.set_authorizer(_read_only_authorizer)
+        try:
+            yield
+        finally:
+            conn.set_authorizer(None)
+
     def execute_query(self, query: str, limit: int = 100) -> Dict[str, Any]:
         """Execute a read-only SQL query (for advanced admin use)."""
-        # Basic safety check - only allow SELECT
-        query_upper = query.strip().upper()
-        if not query_upper.startswith("SELECT"):
-            return {"error": "Only SELECT queries are allowed"}
+        # Add limit if not present
+        if not _LIMIT_RE.search(query):
+            query = f"{query.rstrip().rstrip(';')} LIMIT {limit}"
 
-        conn = self._get_connection()
         try:
-            # Add limit if not present
-            if "LIMIT" not in query_upper:
-                query = f"{query.rstrip(';')} LIMIT {limit}"
-
-            cursor = conn.execute(query)
-            columns = [desc[0] for desc in cursor.description]
-            rows = cursor.fetchall()
-            conn.close()
+            with self._conn() as conn, self._read_only(conn):
+                cursor = conn.cursor()
+                cursor.execute(query)
+                columns = [desc[0] for desc in cursor.description]
+                # Never hold more than `limit` rows, even if the query's own
+                # LIMIT is larger; fetch in chunks instead of fetchall()
+                rows = []
+                while len(rows) < limit:
+                    batch = cursor.fetchmany(min(QUERY_FETCH_SIZE, limit - len(rows)))
+                    if not batch:
+                        break
+                    rows.extend(list(row) for row in batch)
+                cursor.close()
 
             return {
                 "columns": columns,
-                "rows": [list(row) for row in rows],
+                "rows": rows,
                 "count": len(rows)
             }
         except Exception as e:
-            conn.close()
             return {"error": str(e)}
 
 
@@ -2,9 +2,10 @@
 from pathlib import Path
 import os
 
-# Database path - env override for Docker, else relative to project root
-PROJECT_ROOT = Path(__file__).parent.parent.parent
-DB_PATH = Path(os.getenv("DB_PATH", str(PROJECT_ROOT / "data" / "db" / "crawlify.sqlite")))
+# Database path - env override for Docker, else relative to project root.
+# Resolved once here so every connection opens the same absolute path.
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DB_PATH = Path(os.getenv("DB_PATH") or PROJECT_ROOT / "data" / "db" / "crawlify.sqlite").resolve()
 
 # API settings
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
@@ -14,6 +15,19 @@ API_PORT = int(os.getenv("API_PORT", "8000"))
 DEFAULT_LIMIT = 20
 MAX_LIMIT = 100
 
+# Public /api/stats results are cached for this many seconds
+STATS_TTL_S = int(os.getenv("STATS_TTL_S", "60"))
+
+# Admin overview statistics are cached for this many seconds
+ADMIN_STATS_TTL_S = int(os.getenv("ADMIN_STATS_TTL_S", "60"))
+
+# Admin list pages (without search term) are cached for this many seconds
+ADMIN_PAGE_CACHE_TTL_S = int(os.getenv("ADMIN_PAGE_CACHE_TTL_S", "30"))
+
+# Chat: conversations kept in memory (LRU) and messages kept per conversation
+CHAT_CACHE_MAX = int(os.getenv("CHAT_CACHE_MAX", "10000"))
+CHAT_HISTORY_KEEP = 20
+
 # JWT settings
 JWT_SECRET = os.getenv("JWT_SECRET", "change-me-in-production")
 JWT_ALGORITHM = "HS256"
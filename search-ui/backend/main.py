@@ -6,29 +6,38 @@ Can be used by web UI, Telegram bots, or any other client.
 """
 import os
 import secrets
+import threading
 import uuid
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Optional
+from typing import Deque, Dict, Optional
 from fastapi import FastAPI, HTTPException, Query, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pathlib import Path
 import jwt
+import orjson
 
 from models import (
-    SearchRequest, SearchResponse, SearchResultItem,
+    SearchRequest, SearchResponse,
     ChatRequest, ChatResponse, ChatMessage,
     VorgangDetail, StatsResponse,
     LoginRequest, LoginResponse
 )
 from search_service import search_service
 from admin_service import admin_service
-from config import API_HOST, API_PORT, JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRATION_HOURS
+from config import (
+    API_HOST, API_PORT, JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRATION_HOURS,
+    CHAT_CACHE_MAX, CHAT_HISTORY_KEEP,
+)
 
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "anfragen2024")
+ADMIN_USERNAME_B = ADMIN_USERNAME.encode("utf8")
+ADMIN_PASSWORD_B = ADMIN_PASSWORD.encode("utf8")
 
 security = HTTPBearer()
 
@@ -47,12 +56,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory conversation storage (for production, use Redis or similar)
-conversations: Dict[str, list] = {}
+# Admin list and search payloads repeat the same field names and values
+# row after row, so they compress well; tiny responses are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+def orjson_response(payload) -> Response:
+    """Encode a JSON-native payload with orjson in one pass.
+
+    Returning a Response skips FastAPI's jsonable_encoder/response_model
+    pass; callers must already produce the documented response shape, so
+    nullable columns (e.g. titel) must be Optional in models.py.
+    """
+    return Response(content=orjson.dumps(payload), media_type="application/json")
+
+
+class ConversationStore:
+    """In-memory chat histories, bounded in both directions.
+
+    Keeps at most `max_conversations` (least recently used are evicted) with
+    the last `keep` messages each. Shared by the threadpool workers serving
+    /api/chat. Per process; for multiple workers use Redis or similar.
+    """
+
+    def __init__(self, max_conversations: int, keep: int):
+        self._histories: "OrderedDict[str, Deque[Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_conversations = max_conversations
+        self.keep = keep
+
+    def append_message(self, conversation_id: str, role: str, content: str) -> None:
+        with self._lock:
+            history = self._histories.get(conversation_id)
+            if history is None:
+                history = self._histories[conversation_id] = deque(maxlen=self.keep)
+                if len(self._histories) > self.max_conversations:
+                    self._histories.popitem(last=False)
+            else:
+                self._histories.move_to_end(conversation_id)
+            history.append({"role": role, "content": content})
+
+
+conversations = ConversationStore(CHAT_CACHE_MAX, CHAT_HISTORY_KEEP)
 
 
 # --- API Endpoints ---
 
+# Endpoints that query SQLite are plain `def`: FastAPI runs them on its
+# threadpool, so a slow query never blocks the event loop
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint."""
@@ -60,7 +111,7 @@ async def health_check():
 
 
 @app.post("/api/search", response_model=SearchResponse)
-async def search(request: SearchRequest):
+def search(request: SearchRequest):
     """
     Perform semantic search.
 
@@ -82,19 +133,21 @@ async def search(request: SearchRequest):
             filters=request.filters
         )
 
-        return SearchResponse(
-            query=result["query"],
-            results=[SearchResultItem(**r) for r in result["results"]],
-            total_found=result["total_found"],
-            refinement_suggestions=result["refinement_suggestions"],
-            conversation_id=request.conversation_id or str(uuid.uuid4()),
-        )
+        # Result dicts already have the SearchResultItem shape; encoding
+        # them directly skips pydantic re-validation and serialization
+        return orjson_response({
+            "query": result["query"],
+            "results": result["results"],
+            "total_found": result["total_found"],
+            "refinement_suggestions": result["refinement_suggestions"],
+            "conversation_id": request.conversation_id or str(uuid.uuid4()),
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/search")
-async def search_get(
+def search_get(
     q: str = Query(..., min_length=1, description="Search query"),
     limit: int = Query(default=20, ge=1, le=100),
     ressort: Optional[str] = Query(default=None),
@@ -114,11 +167,11 @@ async def search_get(
         limit=limit,
         filters=filters if filters else None
     )
-    return await search(request)
+    return search(request)
 
 
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+def chat(request: ChatRequest):
     """
     Chat-style search interface.
 
@@ -133,14 +186,8 @@ async def chat(request: ChatRequest):
     """
     conversation_id = request.conversation_id or str(uuid.uuid4())
 
-    # Get or create conversation history
-    if conversation_id not in conversations:
-        conversations[conversation_id] = []
-
-    history = conversations[conversation_id]
-
     # Add user message
-    history.append({"role": "user", "content": request.message})
+    conversations.append_message(conversation_id, "user", request.message)
 
     # Perform search
     result = search_service.search(request.message, limit=20)
@@ -156,24 +203,19 @@ async def chat(request: ChatRequest):
     else:
         response_msg = "Leider konnte ich keine passenden Kleine Anfragen finden. Versuchen Sie es mit anderen Suchbegriffen."
 
-    # Add assistant response to history
-    history.append({"role": "assistant", "content": response_msg})
+    # Add assistant response to history (trimmed to the last messages)
+    conversations.append_message(conversation_id, "assistant", response_msg)
 
-    # Keep only last 20 messages
-    if len(history) > 20:
-        history = history[-20:]
-    conversations[conversation_id] = history
-
-    return ChatResponse(
-        message=response_msg,
-        results=[SearchResultItem(**r) for r in result["results"]] if result["results"] else None,
-        refinement_questions=result["refinement_suggestions"],
-        conversation_id=conversation_id,
-    )
+    return orjson_response({
+        "message": response_msg,
+        "results": result["results"] or None,
+        "refinement_questions": result["refinement_suggestions"],
+        "conversation_id": conversation_id,
+    })
 
 
 @app.get("/api/vorgang/{vorgang_id}", response_model=VorgangDetail)
-async def get_vorgang(vorgang_id: str):
+def get_vorgang(vorgang_id: str):
     """
     Get detailed information about a specific Vorgang.
     """
@@ -184,7 +226,7 @@ async def get_vorgang(vorgang_id: str):
 
 
 @app.get("/api/stats", response_model=StatsResponse)
-async def get_stats():
+def get_stats():
     """
     Get database statistics.
 
@@ -197,7 +239,7 @@ async def get_stats():
 @app.post("/api/cache/invalidate")
 async def invalidate_cache():
     """
-    Invalidate embeddings cache.
+    Invalidate the search caches (statistics).
 
     Call this after updating the database to refresh search results.
     """
@@ -221,11 +263,11 @@ def create_access_token(username: str) -> tuple[str, int]:
 async def login(request: LoginRequest):
     is_username_correct = secrets.compare_digest(
         request.username.encode("utf8"),
-        ADMIN_USERNAME.encode("utf8"),
+        ADMIN_USERNAME_B,
     )
     is_password_correct = secrets.compare_digest(
         request.password.encode("utf8"),
-        ADMIN_PASSWORD.encode("utf8"),
+        ADMIN_PASSWORD_B,
     )
     if not (is_username_correct and is_password_correct):
         raise HTTPException(
@@ -255,13 +297,21 @@ def verify_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
 # --- Admin API Endpoints ---
 
 @app.get("/api/admin/overview")
-async def admin_overview(username: str = Depends(verify_admin)):
+def admin_overview(username: str = Depends(verify_admin)):
     """Get detailed database overview for admin."""
     return admin_service.get_overview_stats()
 
 
+@app.post("/api/admin/cache/invalidate")
+async def admin_invalidate_cache(username: str = Depends(verify_admin)):
+    """Invalidate the cached admin overview statistics and list pages."""
+    admin_service.invalidate_stats_cache()
+    admin_service.invalidate_pagination_cache()
+    return {"status": "ok", "message": "Cache invalidated"}
+
+
 @app.get("/api/admin/vorgaenge")
-async def admin_vorgaenge(
+def admin_vorgaenge(
     limit: int = Query(default=50, ge=1, le=500),
     offset: int = Query(default=0, ge=0),
     sort_by: str = Query(default="datum"),
@@ -269,37 +319,43 @@ async def admin_vorgaenge(
     ressort: Optional[str] = Query(default=None),
     status: Optional[str] = Query(default=None),
     search: Optional[str] = Query(default=None),
+    fields: Optional[str] = Query(default=None),
     username: str = Depends(verify_admin)
 ):
-    """Get paginated list of Vorgaenge for admin."""
-    return admin_service.get_vorgaenge(
+    """Get paginated list of Vorgaenge for admin.
+
+    ``fields`` is a comma-separated opt-in for heavy columns
+    (abstrakt, initiatoren, schlagworte); the list view needs none of them.
+    """
+    return orjson_response(admin_service.get_vorgaenge(
         limit=limit,
         offset=offset,
         sort_by=sort_by,
         sort_order=sort_order,
         filter_ressort=ressort,
         filter_status=status,
-        search=search
-    )
+        search=search,
+        fields=fields.split(",") if fields else None
+    ))
 
 
 @app.get("/api/admin/drucksachen")
-async def admin_drucksachen(
+def admin_drucksachen(
     limit: int = Query(default=50, ge=1, le=500),
     offset: int = Query(default=0, ge=0),
     vorgang_id: Optional[str] = Query(default=None),
     username: str = Depends(verify_admin)
 ):
     """Get paginated list of Drucksachen for admin."""
-    return admin_service.get_drucksachen(
+    return orjson_response(admin_service.get_drucksachen(
         limit=limit,
         offset=offset,
         vorgang_id=vorgang_id
-    )
+    ))
 
 
 @app.get("/api/admin/drucksache-text/{drucksache_id}")
-async def admin_drucksache_text(
+def admin_drucksache_text(
     drucksache_id: str,
     username: str = Depends(verify_admin)
 ):
@@ -311,7 +367,7 @@ async def admin_drucksache_text(
 
 
 @app.post("/api/admin/query")
-async def admin_query(
+def admin_query(
     query: str = Query(..., description="SQL SELECT query"),
     limit: int = Query(default=100, ge=1, le=1000),
     username: str = Depends(verify_admin)
@@ -15,7 +15,7 @@ class SearchRequest(BaseModel):
 class SearchResultItem(BaseModel):
     """Single search result item."""
     vorgang_id: str
-    titel: str
+    titel: Optional[str]  # NULL for some DIP Vorgaenge
     datum: Optional[str]
     ressort: Optional[str]
     beratungsstand: Optional[str]
@@ -66,7 +66,7 @@ class VorgangDetail(BaseModel):
     """Detailed view of a single Vorgang."""
     vorgang_id: str
     vorgangstyp: str
-    titel: str
+    titel: Optional[str]
     datum: Optional[str]
     beratungsstand: Optional[str]
     legislature: Optional[str]
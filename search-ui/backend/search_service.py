@@ -1,35 +1,69 @@
 """Search service — uses SQL text search (no embedding model required)."""
-import json
 import sqlite3
-from typing import List, Optional, Dict, Any
+import threading
+import time
+from collections import Counter
+from typing import List, Optional, Dict, Any, Tuple
 from pathlib import Path
 
-from config import DB_PATH
+import orjson
+
+from config import DB_PATH, STATS_TTL_S
+
+
+def _decode_list(raw: Optional[str]) -> Optional[List[Any]]:
+    """Decode a stored JSON list column (initiatoren/schlagworte)."""
+    return orjson.loads(raw) if raw else None
+
+
+def _fts_phrase(text: str) -> str:
+    """Quote user input as one FTS5 phrase (no query syntax)."""
+    return '"' + text.replace('"', '""') + '"'
 
 
 class SearchService:
 
+    def __init__(self) -> None:
+        self._fts_available = False
+        # (monotonic timestamp, payload) of the last get_stats computation
+        self._stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        # One long-lived connection per threadpool worker, set up once
+        self._tls = threading.local()
+
     def _get_connection(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(str(DB_PATH))
-        conn.row_factory = sqlite3.Row
+        conn = getattr(self._tls, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(DB_PATH))
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute("PRAGMA cache_size=-65536")
+            self._tls.conn = conn
         return conn
 
     def _extract_highlight(self, text: str, query: str, max_length: int = 200) -> Optional[str]:
         if not text:
             return None
 
-        query_terms = query.lower().split()
         text_lower = text.lower()
+        # Terms absent from the whole text can't score in any window; once a
+        # window holds all remaining terms no later window can beat it
+        query_terms = [term for term in query.lower().split() if term in text_lower]
 
         best_pos = 0
         best_score = 0
 
-        for i in range(0, len(text), 50):
-            window = text_lower[i:i + max_length]
-            score = sum(1 for term in query_terms if term in window)
-            if score > best_score:
-                best_score = score
-                best_pos = i
+        if query_terms:
+            for i in range(0, len(text), 50):
+                window = text_lower[i:i + max_length]
+                score = sum(1 for term in query_terms if term in window)
+                if score > best_score:
+                    best_score = score
+                    best_pos = i
+                    if score == len(query_terms):
+                        break
 
         start = max(0, best_pos - 20)
         end = min(len(text), start + max_length)
@@ -50,47 +84,35 @@ class SearchService:
     ) -> Dict[str, Any]:
         conn = self._get_connection()
 
-        where_clauses = []
-        params: list = []
-
-        for term in query.split():
-            where_clauses.append("(v.titel LIKE ? OR v.abstrakt LIKE ?)")
-            like = f"%{term}%"
-            params.extend([like, like])
-
-        filter_sql = ""
-        if filters:
-            if filters.get("ressort"):
-                where_clauses.append("v.ressort = ?")
-                params.append(filters["ressort"])
-            if filters.get("beratungsstand"):
-                where_clauses.append("v.beratungsstand = ?")
-                params.append(filters["beratungsstand"])
-
-        where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
-
-        rows = conn.execute(f"""
-            SELECT v.vorgang_id, v.titel, v.datum, v.ressort,
-                   v.beratungsstand, v.abstrakt, v.initiatoren_json, v.schlagworte_json
-            FROM vorgang v
-            WHERE {where_sql}
-            ORDER BY v.datum DESC
-            LIMIT ?
-        """, params + [limit]).fetchall()
-
-        count_row = conn.execute(f"""
-            SELECT COUNT(*) FROM vorgang v WHERE {where_sql}
-        """, params).fetchone()
-        total_found = count_row[0]
+        terms = query.split()
+        # Terms of three or more characters are matched through the trigram
+        # FTS index and ranked by BM25; shorter ones can only use LIKE
+        use_fts = any(len(term) >= 3 for term in terms) and self._has_fts(conn)
+        try:
+            rows, total_found = self._find(conn, terms, filters, limit, use_fts)
+        except sqlite3.OperationalError:
+            if not use_fts:
+                raise
+            rows, total_found = self._find(conn, terms, filters, limit, False)
+
+        # Drucksachen for all hits in one query (idx_drucksache_vorgang)
+        drucksachen_by_vorgang: Dict[str, List[Dict[str, Any]]] = {}
+        if rows:
+            vorgang_ids = [row["vorgang_id"] for row in rows]
+            placeholders = ",".join("?" * len(vorgang_ids))
+            for d in conn.execute(f"""
+                SELECT vorgang_id, drucksache_id, titel, drucksachetyp, drucksache_nummer,
+                       datum, dok_url
+                FROM drucksache
+                WHERE vorgang_id IN ({placeholders})
+            """, vorgang_ids):
+                drucksache = dict(d)
+                drucksachen_by_vorgang.setdefault(drucksache.pop("vorgang_id"), []).append(
+                    drucksache
+                )
 
         results = []
         for row in rows:
-            drucksachen = conn.execute("""
-                SELECT drucksache_id, titel, drucksachetyp, drucksache_nummer, datum, dok_url
-                FROM drucksache
-                WHERE vorgang_id = ?
-            """, (row["vorgang_id"],)).fetchall()
-
             highlight_text = row["abstrakt"] or row["titel"] or ""
             highlight = self._extract_highlight(highlight_text, query)
 
@@ -101,15 +123,13 @@ class SearchService:
                 "ressort": row["ressort"],
                 "beratungsstand": row["beratungsstand"],
                 "abstrakt": row["abstrakt"],
-                "initiatoren": json.loads(row["initiatoren_json"]) if row["initiatoren_json"] else None,
-                "schlagworte": json.loads(row["schlagworte_json"]) if row["schlagworte_json"] else None,
-                "score": 1.0,
+                "initiatoren": _decode_list(row["initiatoren_json"]),
+                "schlagworte": _decode_list(row["schlagworte_json"]),
+                "score": self._score(row["rank"], rows[0]["rank"]),
                 "highlight": highlight,
-                "drucksachen": [dict(d) for d in drucksachen],
+                "drucksachen": drucksachen_by_vorgang.get(row["vorgang_id"], []),
             })
 
-        conn.close()
-
         suggestions = self._generate_refinement_suggestions(query, results)
 
         return {
@@ -119,6 +139,73 @@ class SearchService:
             "refinement_suggestions": suggestions,
         }
 
+    def _find(
+        self,
+        conn: sqlite3.Connection,
+        terms: List[str],
+        filters: Optional[Dict[str, Any]],
+        limit: int,
+        use_fts: bool,
+    ) -> Tuple[List[sqlite3.Row], int]:
+        where_clauses = []
+        params: list = []
+
+        match_terms = [term for term in terms if use_fts and len(term) >= 3]
+        if match_terms:
+            where_clauses.append("vorgang_fts MATCH ?")
+            params.append(" AND ".join(_fts_phrase(term) for term in match_terms))
+        for term in terms:
+            if term not in match_terms:
+                where_clauses.append("(v.titel LIKE ? OR v.abstrakt LIKE ?)")
+                like = f"%{term}%"
+                params.extend([like, like])
+
+        if filters:
+            if filters.get("ressort"):
+                where_clauses.append("v.ressort = ?")
+                params.append(filters["ressort"])
+            if filters.get("beratungsstand"):
+                where_clauses.append("v.beratungsstand = ?")
+                params.append(filters["beratungsstand"])
+
+        where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
+        if match_terms:
+            from_sql = "vorgang_fts JOIN vorgang v ON v.rowid = vorgang_fts.rowid"
+            rank_sql, order_sql = "bm25(vorgang_fts)", "rank, v.datum DESC"
+        else:
+            from_sql = "vorgang v"
+            rank_sql, order_sql = "NULL", "v.datum DESC"
+
+        rows = conn.execute(f"""
+            SELECT v.vorgang_id, v.titel, v.datum, v.ressort,
+                   v.beratungsstand, v.abstrakt, v.initiatoren_json, v.schlagworte_json,
+                   {rank_sql} AS rank
+            FROM {from_sql}
+            WHERE {where_sql}
+            ORDER BY {order_sql}
+            LIMIT ?
+        """, params + [limit]).fetchall()
+
+        count_row = conn.execute(f"""
+            SELECT COUNT(*) FROM {from_sql} WHERE {where_sql}
+        """, params).fetchone()
+        return rows, count_row[0]
+
+    @staticmethod
+    def _score(rank: Optional[float], best: Optional[float]) -> float:
+        # bm25() is negative, lower is better; scale so the best hit is 1.0
+        if rank is None or not best:
+            return 1.0
+        return rank / best
+
+    def _has_fts(self, conn: sqlite3.Connection) -> bool:
+        # The index is created by the crawler's init_db; remember once seen
+        if not self._fts_available:
+            self._fts_available = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vorgang_fts'"
+            ).fetchone() is not None
+        return self._fts_available
+
     def _generate_refinement_suggestions(
         self,
         query: str,
@@ -132,27 +219,20 @@ class SearchService:
             return suggestions
 
         # Collect common ressorts and schlagworte from results
-        ressorts = {}
-        schlagworte = {}
-
-        for r in results[:10]:
-            if r.get("ressort"):
-                ressorts[r["ressort"]] = ressorts.get(r["ressort"], 0) + 1
-            if r.get("schlagworte"):
-                for s in r["schlagworte"]:
-                    schlagworte[s] = schlagworte.get(s, 0) + 1
+        top = results[:10]
+        ressorts = Counter(r["ressort"] for r in top if r.get("ressort"))
+        schlagworte = Counter(s for r in top for s in (r.get("schlagworte") or []))
 
         # Suggest filtering by common ressort
         if ressorts:
-            top_ressort = max(ressorts.items(), key=lambda x: x[1])[0]
+            top_ressort = ressorts.most_common(1)[0][0]
             suggestions.append(f"Ergebnisse auf '{top_ressort}' eingrenzen?")
 
-        # Suggest related keywords
-        if schlagworte:
-            top_keywords = sorted(schlagworte.items(), key=lambda x: x[1], reverse=True)[:3]
-            for kw, _ in top_keywords:
-                if kw.lower() not in query.lower():
-                    suggestions.append(f"Auch nach '{kw}' suchen?")
+        # Suggest related keywords (most_common(n) is a heap selection, not a sort)
+        query_lower = query.lower()
+        for kw, _ in schlagworte.most_common(3):
+            if kw.lower() not in query_lower:
+                suggestions.append(f"Auch nach '{kw}' suchen?")
 
         # Suggest status filter
         suggestions.append("Nur beantwortete Anfragen anzeigen?")
@@ -163,28 +243,29 @@ class SearchService:
         """Get detailed information about a specific Vorgang."""
         conn = self._get_connection()
 
+        # One round-trip: the Drucksachen (with text) come back as a JSON array
         row = conn.execute("""
-            SELECT vorgang_id, vorgangstyp, titel, datum, beratungsstand,
-                   legislature, ressort, abstrakt, initiatoren_json, schlagworte_json
-            FROM vorgang
-            WHERE vorgang_id = ?
+            SELECT v.vorgang_id, v.vorgangstyp, v.titel, v.datum, v.beratungsstand,
+                   v.legislature, v.ressort, v.abstrakt, v.initiatoren_json,
+                   v.schlagworte_json,
+                   (SELECT json_group_array(json_object(
+                               'drucksache_id', d.drucksache_id,
+                               'titel', d.titel,
+                               'drucksachetyp', d.drucksachetyp,
+                               'drucksache_nummer', d.drucksache_nummer,
+                               'datum', d.datum,
+                               'dok_url', d.dok_url,
+                               'volltext', dt.volltext))
+                    FROM drucksache d
+                    LEFT JOIN drucksache_text dt ON d.drucksache_id = dt.drucksache_id
+                    WHERE d.vorgang_id = v.vorgang_id) AS drucksachen_json
+            FROM vorgang v
+            WHERE v.vorgang_id = ?
         """, (vorgang_id,)).fetchone()
 
         if not row:
-            conn.close()
             return None
 
-        # Get drucksachen with text
-        drucksachen = conn.execute("""
-            SELECT d.drucksache_id, d.titel, d.drucksachetyp, d.drucksache_nummer,
-                   d.datum, d.dok_url, dt.volltext
-            FROM drucksache d
-            LEFT JOIN drucksache_text dt ON d.drucksache_id = dt.drucksache_id
-            WHERE d.vorgang_id = ?
-        """, (vorgang_id,)).fetchall()
-
-        conn.close()
-
         return {
             "vorgang_id": row["vorgang_id"],
             "vorgangstyp": row["vorgangstyp"],
@@ -194,20 +275,29 @@ class SearchService:
             "legislature": row["legislature"],
             "ressort": row["ressort"],
             "abstrakt": row["abstrakt"],
-            "initiatoren": json.loads(row["initiatoren_json"]) if row["initiatoren_json"] else None,
-            "schlagworte": json.loads(row["schlagworte_json"]) if row["schlagworte_json"] else None,
-            "drucksachen": [dict(d) for d in drucksachen],
+            "initiatoren": _decode_list(row["initiatoren_json"]),
+            "schlagworte": _decode_list(row["schlagworte_json"]),
+            "drucksachen": orjson.loads(row["drucksachen_json"]),
         }
 
     def get_stats(self) -> Dict[str, Any]:
-        """Get database statistics."""
+        """Get database statistics (cached for STATS_TTL_S)."""
+        cached = self._stats_cache
+        if cached and time.monotonic() - cached[0] < STATS_TTL_S:
+            return cached[1]
+        stats = self._compute_stats()
+        self._stats_cache = (time.monotonic(), stats)
+        return stats
+
+    def _compute_stats(self) -> Dict[str, Any]:
         conn = self._get_connection()
 
-        total_vorgaenge = conn.execute("SELECT COUNT(*) FROM vorgang").fetchone()[0]
-        total_drucksachen = conn.execute("SELECT COUNT(*) FROM drucksache").fetchone()[0]
-        total_with_embeddings = conn.execute(
-            "SELECT COUNT(*) FROM vorgang WHERE embedding_json IS NOT NULL"
-        ).fetchone()[0]
+        # One statement; each count is answered from an index
+        total_vorgaenge, total_drucksachen, total_with_embeddings = conn.execute("""
+            SELECT (SELECT COUNT(*) FROM vorgang),
+                   (SELECT COUNT(*) FROM drucksache),
+                   (SELECT COUNT(*) FROM vorgang WHERE embedding_json IS NOT NULL)
+        """).fetchone()
 
         ressorts = conn.execute("""
             SELECT ressort, COUNT(*) as count
@@ -225,8 +315,6 @@ class SearchService:
             ORDER BY count DESC
         """).fetchall()
 
-        conn.close()
-
         return {
             "total_vorgaenge": total_vorgaenge,
             "total_drucksachen": total_drucksachen,
@@ -236,8 +324,8 @@ class SearchService:
         }
 
     def invalidate_cache(self):
-        """Invalidate the embeddings cache."""
-        self._embeddings_cache = None
+        """Invalidate the cached statistics."""
+        self._stats_cache = None
 
 
 # Singleton instance
@@ -1,17 +1,31 @@
 """Browser automation for solving Enodia bot protection challenges."""
 from __future__ import annotations
 
+import atexit
 import json
 import logging
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 ENODIA_CHALLENGE_PATH = "/.enodia/challenge"
 
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+
+# Playwright's sync API is bound to the thread that started it. Only the
+# main thread keeps its browser (one per headless mode) across challenges:
+# atexit runs there and can close it. Worker threads (fetch pools) launch a
+# browser per challenge and close it again, so none outlives its thread.
+_main_contexts: Dict[bool, Any] = {}
+
 
 @dataclass
 class CookieData:
@@ -42,6 +56,35 @@ def is_challenge_url(url: str) -> bool:
     return ENODIA_CHALLENGE_PATH in url
 
 
+def _launch_browser(sync_playwright: Any, headless: bool) -> Tuple[Any, Any, Any]:
+    playwright = sync_playwright().start()
+    browser = playwright.chromium.launch(headless=headless)
+    return playwright, browser, browser.new_context(user_agent=USER_AGENT)
+
+
+def _main_browser_context(sync_playwright: Any, headless: bool) -> Any:
+    """Main thread's browser context, launched on first use and reused."""
+    cached = _main_contexts.get(headless)
+    if cached is not None:
+        playwright, browser, context = cached
+        if browser.is_connected():
+            return context
+        _close_browser(playwright, browser)
+
+    playwright, browser, context = _launch_browser(sync_playwright, headless)
+    _main_contexts[headless] = (playwright, browser, context)
+    atexit.register(_close_browser, playwright, browser)
+    return context
+
+
+def _close_browser(playwright: Any, browser: Any) -> None:
+    try:
+        browser.close()
+        playwright.stop()
+    except Exception:  # already gone
+        pass
+
+
 def solve_enodia_challenge(
     challenge_url: str,
     timeout_ms: int = 60000,
@@ -52,6 +95,8 @@ def solve_enodia_challenge(
 
     Opens the challenge URL in a browser, waits for the challenge to be solved
     (detected by URL changing away from the challenge path), then extracts cookies.
+    On the main thread the browser is launched once and reused by later
+    challenges; on other threads it is closed before returning.
 
     Args:
         challenge_url: The full challenge URL (including redirect parameter)
@@ -76,59 +121,58 @@ def solve_enodia_challenge(
 
     logger.info(f"Solving Enodia challenge: {challenge_url[:80]}...")
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=headless)
-        context = browser.new_context(
-            user_agent=(
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            )
-        )
-        page = context.new_page()
+    owned = None
+    if threading.current_thread() is threading.main_thread():
+        context = _main_browser_context(sync_playwright, headless)
+    else:
+        owned = _launch_browser(sync_playwright, headless)
+        context = owned[2]
+    page = context.new_page()
+
+    try:
+        # Navigate to challenge URL
+        page.goto(challenge_url, timeout=timeout_ms)
 
+        # Wait for URL to change away from challenge path
+        # This indicates the challenge was solved and we're redirected
+        logger.info("Waiting for challenge to be solved...")
+
+        # Resolves on the navigation event (or at once if already redirected)
         try:
-            # Navigate to challenge URL
-            page.goto(challenge_url, timeout=timeout_ms)
-
-            # Wait for URL to change away from challenge path
-            # This indicates the challenge was solved and we're redirected
-            logger.info("Waiting for challenge to be solved...")
-
-            start_time = time.time()
-            while ENODIA_CHALLENGE_PATH in page.url:
-                if (time.time() - start_time) * 1000 > timeout_ms:
-                    raise TimeoutError(
-                        f"Challenge not solved within {timeout_ms}ms. "
-                        "The challenge may require manual interaction."
-                    )
-                page.wait_for_timeout(500)  # Check every 500ms
-
-            logger.info(f"Challenge solved, redirected to: {page.url[:80]}...")
-
-            # Extract cookies from browser context
-            browser_cookies = context.cookies()
-            cookies_dict = {c["name"]: c["value"] for c in browser_cookies}
-
-            # Extract domain from URL
-            from urllib.parse import urlparse
-
-            parsed = urlparse(challenge_url)
-            domain = parsed.netloc
-
-            cookie_data = CookieData(
-                cookies=cookies_dict,
-                domain=domain,
-                extracted_at=time.time(),
+            page.wait_for_url(lambda url: ENODIA_CHALLENGE_PATH not in url, timeout=timeout_ms)
+        except PWTimeoutError:
+            raise TimeoutError(
+                f"Challenge not solved within {timeout_ms}ms. "
+                "The challenge may require manual interaction."
             )
 
-            logger.info(f"Extracted {len(cookies_dict)} cookies from {domain}")
-            return cookie_data
+        logger.info(f"Challenge solved, redirected to: {page.url[:80]}...")
+
+        # Extract cookies from browser context
+        browser_cookies = context.cookies()
+        cookies_dict = {c["name"]: c["value"] for c in browser_cookies}
+
+        # Extract domain from URL
+        from urllib.parse import urlparse
+
+        parsed = urlparse(challenge_url)
+        domain = parsed.netloc
+
+        cookie_data = CookieData(
+            cookies=cookies_dict,
+            domain=domain,
+            extracted_at=time.time(),
+        )
+
+        logger.info(f"Extracted {len(cookies_dict)} cookies from {domain}")
+        return cookie_data
 
-        except PWTimeoutError as e:
-            raise TimeoutError(f"Playwright timeout: {e}")
-        finally:
-            browser.close()
+    except PWTimeoutError as e:
+        raise TimeoutError(f"Playwright timeout: {e}")
+    finally:
+        page.close()
+        if owned is not None:
+            _close_browser(owned[0], owned[1])
 
 
 def save_cookies(cookie_data: CookieData, path: Path) -> None:
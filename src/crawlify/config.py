@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 
 from dotenv import load_dotenv
 
@@ -16,9 +17,16 @@ class Config:
     max_retries: int
     backoff_base_s: float
     page_size: int
+    # Client-side request rate limit towards DIP; 0 disables it
+    dip_rate_per_sec: float = 10.0
 
 
+@lru_cache(maxsize=1)
 def load_config() -> Config:
+    """Config from the environment, read once per process.
+
+    Call `load_config.cache_clear()` after changing DIP_* variables.
+    """
     return Config(
         dip_base_url=os.getenv("DIP_BASE_URL", "https://search.dip.bundestag.de/api/v1"),
         dip_api_key=os.getenv("DIP_API_KEY", ""),
@@ -26,4 +34,5 @@ def load_config() -> Config:
         max_retries=int(os.getenv("DIP_MAX_RETRIES", "5")),
         backoff_base_s=float(os.getenv("DIP_BACKOFF_BASE_S", "0.6")),
         page_size=int(os.getenv("DIP_PAGE_SIZE", "100")),
+        dip_rate_per_sec=float(os.getenv("DIP_RATE_PER_SEC", "10")),
     )
@@ -1,10 +1,78 @@
 from __future__ import annotations
 
-import json
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+
+
+# Constant statements let sqlite3 reuse its prepared-statement cache
+# instead of re-parsing the upsert SQL on every call.
+_UPSERT_VORGANG = """
+INSERT INTO vorgang (
+    vorgang_id, vorgangstyp, titel, datum, beratungsstand, legislature,
+    initiatoren_json, ressort, schlagworte_json, abstrakt, quelle,
+    embedding_text, embedding_json, embedding_version, raw_json, updated_at
+) VALUES (
+    :vorgang_id, :vorgangstyp, :titel, :datum, :beratungsstand, :legislature,
+    :initiatoren_json, :ressort, :schlagworte_json, :abstrakt, :quelle,
+    :embedding_text, :embedding_json, :embedding_version, :raw_json, :updated_at
+)
+ON CONFLICT(vorgang_id) DO UPDATE SET
+    vorgangstyp=excluded.vorgangstyp,
+    titel=excluded.titel,
+    datum=excluded.datum,
+    beratungsstand=excluded.beratungsstand,
+    legislature=excluded.legislature,
+    initiatoren_json=excluded.initiatoren_json,
+    ressort=excluded.ressort,
+    schlagworte_json=excluded.schlagworte_json,
+    abstrakt=excluded.abstrakt,
+    quelle=excluded.quelle,
+    embedding_text=excluded.embedding_text,
+    embedding_json=excluded.embedding_json,
+    embedding_version=excluded.embedding_version,
+    raw_json=excluded.raw_json,
+    updated_at=excluded.updated_at
+"""
+
+_UPSERT_DRUCKSACHE = """
+INSERT INTO drucksache (
+    drucksache_id, vorgang_id, titel, drucksachetyp, drucksache_nummer,
+    datum, dok_url, dokument_typ, raw_json, updated_at
+) VALUES (
+    :drucksache_id, :vorgang_id, :titel, :drucksachetyp, :drucksache_nummer,
+    :datum, :dok_url, :dokument_typ, :raw_json, :updated_at
+)
+ON CONFLICT(drucksache_id) DO UPDATE SET
+    vorgang_id=excluded.vorgang_id,
+    titel=excluded.titel,
+    drucksachetyp=excluded.drucksachetyp,
+    drucksache_nummer=excluded.drucksache_nummer,
+    datum=excluded.datum,
+    dok_url=excluded.dok_url,
+    dokument_typ=excluded.dokument_typ,
+    raw_json=excluded.raw_json,
+    updated_at=excluded.updated_at
+"""
+
+_UPSERT_DRUCKSACHE_TEXT = """
+INSERT INTO drucksache_text (
+    drucksache_id, volltext, text_format, raw_json, updated_at
+) VALUES (
+    :drucksache_id, :volltext, :text_format, :raw_json, :updated_at
+)
+ON CONFLICT(drucksache_id) DO UPDATE SET
+    volltext=excluded.volltext,
+    text_format=excluded.text_format,
+    raw_json=excluded.raw_json,
+    updated_at=excluded.updated_at
+"""
 
 
 @dataclass
@@ -12,14 +80,51 @@ class DbConfig:
     path: Path
 
 
-def connect(cfg: DbConfig) -> sqlite3.Connection:
+def connect(cfg: DbConfig, check_same_thread: bool = True) -> sqlite3.Connection:
     cfg.path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(cfg.path))
+    # Autocommit mode: transactions are opened explicitly via transaction()
+    # instead of by sqlite3's implicit BEGIN bookkeeping on every DML.
+    conn = sqlite3.connect(
+        str(cfg.path), isolation_level=None, check_same_thread=check_same_thread
+    )
     conn.row_factory = sqlite3.Row
+    # WAL turns commits into appends and lets readers (search UI) run
+    # alongside the ingest writer; NORMAL sync is safe in WAL mode.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-65536")
     return conn
 
 
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Run the block in one write transaction; joins an already open one."""
+    if conn.in_transaction:
+        yield conn
+        return
+    # IMMEDIATE takes the write lock up front (waiting out busy_timeout), so
+    # a transaction that reads before writing cannot fail with SQLITE_BUSY
+    # on the upgrade when another writer committed in between (WAL)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+# Stored in PRAGMA user_version once init_db has brought a database up to
+# date; bump it whenever the schema, indexes or migrations below change.
+SCHEMA_VERSION = 1
+
+
 def init_db(conn: sqlite3.Connection) -> None:
+    if conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+        _analyze_once(conn)
+        return
     conn.executescript(
         """
         CREATE TABLE IF NOT EXISTS vorgang (
@@ -35,7 +140,7 @@ def init_db(conn: sqlite3.Connection) -> None:
             abstrakt TEXT,
             quelle TEXT NOT NULL,
             embedding_text TEXT,
-            embedding_json TEXT,
+            embedding_json TEXT,  -- float32 bytes (BLOB); JSON text in older rows
             embedding_version TEXT,
             raw_json TEXT NOT NULL,
             updated_at TEXT NOT NULL
@@ -63,102 +168,306 @@ def init_db(conn: sqlite3.Connection) -> None:
             updated_at TEXT NOT NULL,
             FOREIGN KEY (drucksache_id) REFERENCES drucksache(drucksache_id)
         );
+
+        CREATE TABLE IF NOT EXISTS http_cache (
+            cache_key TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_drucksache_vorgang ON drucksache(vorgang_id);
+        CREATE INDEX IF NOT EXISTS idx_vorgang_datum ON vorgang(datum DESC);
+        CREATE INDEX IF NOT EXISTS idx_vorgang_updated_at ON vorgang(updated_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_vorgang_ressort_datum ON vorgang(ressort, datum DESC);
+        CREATE INDEX IF NOT EXISTS idx_vorgang_beratungsstand_datum
+            ON vorgang(beratungsstand, datum DESC);
+        CREATE INDEX IF NOT EXISTS idx_drucksache_datum ON drucksache(datum DESC);
+        CREATE INDEX IF NOT EXISTS idx_vorgang_has_embedding
+            ON vorgang(vorgang_id) WHERE embedding_json IS NOT NULL;
+        CREATE INDEX IF NOT EXISTS idx_vorgang_needs_embedding
+            ON vorgang(vorgang_id) WHERE embedding_json IS NULL OR embedding_version IS NULL;
         """
     )
-    conn.commit()
+    _migrate_generated_columns(conn)
+    _migrate_vorgang_fts(conn)
+    _analyze_once(conn)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def _migrate_generated_columns(conn: sqlite3.Connection) -> None:
+    # Fields only needed for filtering are extracted by SQLite from raw_json
+    # (JSON1) instead of being normalized in Python. VIRTUAL columns can be
+    # added to existing databases without rewriting rows.
+    columns = {row[1] for row in conn.execute("PRAGMA table_xinfo(vorgang)")}
+    if "aktualisiert" not in columns:
+        conn.execute(
+            "ALTER TABLE vorgang ADD COLUMN aktualisiert TEXT "
+            "GENERATED ALWAYS AS (json_extract(raw_json, '$.aktualisiert')) VIRTUAL"
+        )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vorgang_aktualisiert ON vorgang(aktualisiert)")
+
+
+def _analyze_once(conn: sqlite3.Connection) -> None:
+    # Gather planner statistics the first time the schema is set up so the
+    # admin filter/sort indexes above are actually chosen. Later runs leave
+    # refreshing them to PRAGMA optimize.
+    has_stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+    ).fetchone()
+    if has_stats:
+        conn.execute("PRAGMA optimize")
+    else:
+        conn.execute("ANALYZE")
+
+
+def _migrate_vorgang_fts(conn: sqlite3.Connection) -> None:
+    # Trigram FTS5 index over titel/abstrakt for substring search in the
+    # search UI, kept in sync by triggers. Skipped if this SQLite build
+    # lacks FTS5 or the trigram tokenizer (readers then fall back to LIKE).
+    # The index is keyed on vorgang's implicit rowid, which VACUUM may
+    # renumber (vorgang_id is a TEXT key), so compact with vacuum_db().
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vorgang_fts'"
+    ).fetchone()
+    if exists:
+        return
+    try:
+        with transaction(conn):
+            conn.execute(
+                "CREATE VIRTUAL TABLE vorgang_fts USING fts5("
+                "titel, abstrakt, content='vorgang', content_rowid='rowid', tokenize='trigram')"
+            )
+            conn.execute(
+                """
+                CREATE TRIGGER vorgang_fts_ai AFTER INSERT ON vorgang BEGIN
+                    INSERT INTO vorgang_fts(rowid, titel, abstrakt)
+                    VALUES (new.rowid, new.titel, new.abstrakt);
+                END
+                """
+            )
+            conn.execute(
+                """
+                CREATE TRIGGER vorgang_fts_ad AFTER DELETE ON vorgang BEGIN
+                    INSERT INTO vorgang_fts(vorgang_fts, rowid, titel, abstrakt)
+                    VALUES ('delete', old.rowid, old.titel, old.abstrakt);
+                END
+                """
+            )
+            conn.execute(
+                """
+                CREATE TRIGGER vorgang_fts_au AFTER UPDATE OF titel, abstrakt ON vorgang BEGIN
+                    INSERT INTO vorgang_fts(vorgang_fts, rowid, titel, abstrakt)
+                    VALUES ('delete', old.rowid, old.titel, old.abstrakt);
+                    INSERT INTO vorgang_fts(rowid, titel, abstrakt)
+                    VALUES (new.rowid, new.titel, new.abstrakt);
+                END
+                """
+            )
+            conn.execute("INSERT INTO vorgang_fts(vorgang_fts) VALUES ('rebuild')")
+    except sqlite3.OperationalError:
+        return
+
+
+def vacuum_db(conn: sqlite3.Connection) -> None:
+    """VACUUM the database and rebuild vorgang_fts against the new rowids."""
+    conn.execute("VACUUM")
+    has_fts = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vorgang_fts'"
+    ).fetchone()
+    if has_fts:
+        with transaction(conn):
+            conn.execute("INSERT INTO vorgang_fts(vorgang_fts) VALUES ('rebuild')")
+
+
+def get_max_aktualisiert(conn: sqlite3.Connection) -> Optional[str]:
+    """Latest DIP `aktualisiert` timestamp among stored vorgänge, if any (index lookup)."""
+    row = conn.execute("SELECT MAX(aktualisiert) FROM vorgang").fetchone()
+    return row[0]
 
 
 def upsert_vorgang(conn: sqlite3.Connection, row: Dict[str, Any]) -> None:
-    payload = row.copy()
-    payload["initiatoren_json"] = _json_or_none(payload.get("initiatoren_json"))
-    payload["schlagworte_json"] = _json_or_none(payload.get("schlagworte_json"))
-    payload["raw_json"] = json.dumps(payload.get("raw_json") or {}, ensure_ascii=True)
+    upsert_vorgang_many(conn, [row])
 
-    conn.execute(
-        """
-        INSERT INTO vorgang (
-            vorgang_id, vorgangstyp, titel, datum, beratungsstand, legislature,
-            initiatoren_json, ressort, schlagworte_json, abstrakt, quelle,
-            embedding_text, embedding_json, embedding_version, raw_json, updated_at
-        ) VALUES (
-            :vorgang_id, :vorgangstyp, :titel, :datum, :beratungsstand, :legislature,
-            :initiatoren_json, :ressort, :schlagworte_json, :abstrakt, :quelle,
-            :embedding_text, :embedding_json, :embedding_version, :raw_json, :updated_at
-        )
-        ON CONFLICT(vorgang_id) DO UPDATE SET
-            vorgangstyp=excluded.vorgangstyp,
-            titel=excluded.titel,
-            datum=excluded.datum,
-            beratungsstand=excluded.beratungsstand,
-            legislature=excluded.legislature,
-            initiatoren_json=excluded.initiatoren_json,
-            ressort=excluded.ressort,
-            schlagworte_json=excluded.schlagworte_json,
-            abstrakt=excluded.abstrakt,
-            quelle=excluded.quelle,
-            embedding_text=excluded.embedding_text,
-            embedding_json=excluded.embedding_json,
-            embedding_version=excluded.embedding_version,
-            raw_json=excluded.raw_json,
-            updated_at=excluded.updated_at
-        """,
-        payload,
-    )
-    conn.commit()
+
+def upsert_vorgang_many(conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]]) -> None:
+    """Upsert a batch of normalized vorgang rows in a single transaction."""
+    payloads = [_vorgang_payload(row) for row in rows]
+    if not payloads:
+        return
+
+    with transaction(conn):
+        conn.executemany(_UPSERT_VORGANG, payloads)
 
 
 def upsert_drucksache(conn: sqlite3.Connection, row: Dict[str, Any]) -> None:
-    payload = row.copy()
-    payload["raw_json"] = json.dumps(payload.get("raw_json") or {}, ensure_ascii=True)
+    upsert_drucksache_many(conn, [row])
 
-    conn.execute(
-        """
-        INSERT INTO drucksache (
-            drucksache_id, vorgang_id, titel, drucksachetyp, drucksache_nummer,
-            datum, dok_url, dokument_typ, raw_json, updated_at
-        ) VALUES (
-            :drucksache_id, :vorgang_id, :titel, :drucksachetyp, :drucksache_nummer,
-            :datum, :dok_url, :dokument_typ, :raw_json, :updated_at
-        )
-        ON CONFLICT(drucksache_id) DO UPDATE SET
-            vorgang_id=excluded.vorgang_id,
-            titel=excluded.titel,
-            drucksachetyp=excluded.drucksachetyp,
-            drucksache_nummer=excluded.drucksache_nummer,
-            datum=excluded.datum,
-            dok_url=excluded.dok_url,
-            dokument_typ=excluded.dokument_typ,
-            raw_json=excluded.raw_json,
-            updated_at=excluded.updated_at
-        """,
-        payload,
-    )
-    conn.commit()
+
+def upsert_drucksache_many(conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]]) -> None:
+    """Upsert a batch of normalized drucksache rows in a single transaction."""
+    payloads = [_raw_payload(row) for row in rows]
+    if not payloads:
+        return
+
+    with transaction(conn):
+        conn.executemany(_UPSERT_DRUCKSACHE, payloads)
 
 
 def upsert_drucksache_text(conn: sqlite3.Connection, row: Dict[str, Any]) -> None:
-    payload = row.copy()
-    payload["raw_json"] = json.dumps(payload.get("raw_json") or {}, ensure_ascii=True)
+    upsert_drucksache_text_many(conn, [row])
 
-    conn.execute(
-        """
-        INSERT INTO drucksache_text (
-            drucksache_id, volltext, text_format, raw_json, updated_at
-        ) VALUES (
-            :drucksache_id, :volltext, :text_format, :raw_json, :updated_at
+
+def upsert_drucksache_text_many(conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]]) -> None:
+    """Upsert a batch of normalized drucksache_text rows in a single transaction."""
+    payloads = [_raw_payload(row) for row in rows]
+    if not payloads:
+        return
+
+    with transaction(conn):
+        conn.executemany(_UPSERT_DRUCKSACHE_TEXT, payloads)
+
+
+def load_http_cache(conn: sqlite3.Connection) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """ETag/Last-Modified validators of earlier DIP responses, by request key."""
+    rows = conn.execute("SELECT cache_key, etag, last_modified FROM http_cache")
+    return {key: (etag, last_modified) for key, etag, last_modified in rows}
+
+
+def save_http_cache(
+    conn: sqlite3.Connection, entries: Dict[str, Tuple[Optional[str], Optional[str]]]
+) -> None:
+    """Replace the stored validators with `entries` (keys not in it are dropped)."""
+    with transaction(conn):
+        conn.execute("DELETE FROM http_cache")
+        conn.executemany(
+            "INSERT INTO http_cache (cache_key, etag, last_modified) VALUES (?, ?, ?)",
+            [(key, etag, last_modified) for key, (etag, last_modified) in entries.items()],
         )
-        ON CONFLICT(drucksache_id) DO UPDATE SET
-            volltext=excluded.volltext,
-            text_format=excluded.text_format,
-            raw_json=excluded.raw_json,
-            updated_at=excluded.updated_at
-        """,
-        payload,
-    )
-    conn.commit()
+
+
+def _vorgang_payload(row: Dict[str, Any]) -> Dict[str, Any]:
+    payload = _raw_payload(row)
+    payload["initiatoren_json"] = _json_or_none(payload.get("initiatoren_json"))
+    payload["schlagworte_json"] = _json_or_none(payload.get("schlagworte_json"))
+    return payload
+
+
+def _raw_payload(row: Dict[str, Any]) -> Dict[str, Any]:
+    payload = row.copy()
+    payload["raw_json"] = _dumps(payload.get("raw_json") or {})
+    return payload
 
 
 def _json_or_none(value: Optional[Any]) -> Optional[str]:
     if value is None:
         return None
-    return json.dumps(value, ensure_ascii=True)
+    return _dumps(value)
+
+
+def _dumps(value: Any) -> str:
+    # orjson writes compact UTF-8 instead of ASCII escapes; json_extract and
+    # the readers parse both forms alike
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+_UPSERTERS: Dict[str, Callable[[sqlite3.Connection, Iterable[Dict[str, Any]]], None]] = {
+    "vorgang": upsert_vorgang_many,
+    "drucksache": upsert_drucksache_many,
+    "drucksache_text": upsert_drucksache_text_many,
+}
+
+_STOP = object()
+
+
+class BackgroundWriter:
+    """Apply upserts on a dedicated thread so the caller can keep fetching.
+
+    Rows are committed in transactions of up to `batch_rows` rows, or after
+    `idle_s` seconds without new rows. The connection must be opened with
+    check_same_thread=False and must not be used elsewhere until close().
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        maxsize: int = 200,
+        batch_rows: int = 500,
+        idle_s: float = 2.0,
+    ) -> None:
+        self._conn = conn
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._batch_rows = batch_rows
+        self._idle_s = idle_s
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """Queue rows for `table` (vorgang, drucksache or drucksache_text)."""
+        if self._error is not None:
+            raise self._error
+        if rows:
+            self._queue.put((table, rows))
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Run `callback` on the writer thread once all rows queued so far are committed."""
+        self._queue.put((None, callback))
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self) -> "BackgroundWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        try:
+            self.close()
+        except Exception:
+            if exc_type is None:
+                raise
+
+    def _run(self) -> None:
+        pending: Dict[str, List[Dict[str, Any]]] = {}
+        callbacks: List[Callable[[], None]] = []
+        n_pending = 0
+        while True:
+            try:
+                item = self._queue.get(timeout=self._idle_s if n_pending or callbacks else None)
+            except queue.Empty:
+                item = None
+            if item is None or item is _STOP:
+                self._flush(pending, callbacks)
+                n_pending = 0
+                if item is _STOP:
+                    return
+                continue
+
+            table, payload = item
+            if table is None:
+                callbacks.append(payload)
+            else:
+                pending.setdefault(table, []).extend(payload)
+                n_pending += len(payload)
+            if n_pending >= self._batch_rows:
+                self._flush(pending, callbacks)
+                n_pending = 0
+
+    def _flush(
+        self, pending: Dict[str, List[Dict[str, Any]]], callbacks: List[Callable[[], None]]
+    ) -> None:
+        try:
+            if self._error is None:
+                with transaction(self._conn):
+                    for table, rows in pending.items():
+                        _UPSERTERS[table](self._conn, rows)
+                for callback in callbacks:
+                    callback()
+        except BaseException as err:
+            # Surfaced to the producer on its next put() or on close()
+            self._error = err
+        finally:
+            pending.clear()
+            callbacks.clear()
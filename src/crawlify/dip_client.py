@@ -1,28 +1,107 @@
 from __future__ import annotations
 
-import json
+import hashlib
 import logging
+import os
 import random
+import socket
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+from urllib.parse import urlencode
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
 
 from .config import Config
 
 logger = logging.getLogger(__name__)
 
 RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Responses meaning "too fast": the limiter halves its rate on these
+THROTTLE_STATUS_CODES = {429, 503}
 ENODIA_CHALLENGE_PATH = "/.enodia/challenge"
 
+# Keep-alive pool sized for concurrent callers (update_db fetches in threads)
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 64
+
+# TCP keepalive probes so pooled sockets idle during backoff, rate limiting
+# or a challenge solve are not silently dropped by NATs/proxies
+_KEEPALIVE_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)] + [
+    (socket.IPPROTO_TCP, getattr(socket, name), value)
+    for name, value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 15), ("TCP_KEEPCNT", 4))
+    if hasattr(socket, name)
+]
+
+# Conditional-request validators per request key: (etag, last_modified)
+HttpCache = Dict[str, Tuple[Optional[str], Optional[str]]]
+
 
 @dataclass
 class Page:
     items: List[Dict[str, Any]]
     cursor: Optional[str]
     raw: Dict[str, Any]
+    # (cache key, ETag, Last-Modified) of a complete single-page result;
+    # recorded via DipClient.remember_validators once the items are stored
+    validators: Optional[Tuple[str, Optional[str], Optional[str]]] = None
+
+
+# AIMD rate control: each success adds max_rate / RATE_RECOVERY_STEPS back,
+# and the rate never falls below max_rate / RATE_FLOOR_DIVISOR
+RATE_RECOVERY_STEPS = 20
+RATE_FLOOR_DIVISOR = 32
+
+
+class RateLimiter:
+    """Thread-safe token bucket: `rate` requests/s with bursts up to `burst`.
+
+    `observe` adapts the rate to the server (AIMD): halved on 429/503,
+    raised additively on success up to the configured `max_rate`.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        self.rate = rate
+        self.max_rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_s = (1 - self.tokens) / self.rate
+            time.sleep(wait_s)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all callers for `seconds` (e.g. after a 429 Retry-After)."""
+        with self._lock:
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+    def observe(self, status_code: int) -> None:
+        """Adjust the rate to the status of a completed request."""
+        if self.max_rate <= 0:
+            return
+        with self._lock:
+            if status_code in THROTTLE_STATUS_CODES:
+                self.rate = max(self.max_rate / RATE_FLOOR_DIVISOR, self.rate * 0.5)
+            elif status_code < 400:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / RATE_RECOVERY_STEPS)
 
 
 class EmptyResponseError(Exception):
@@ -37,17 +116,37 @@ class DipClient:
         session: Optional[requests.Session] = None,
         cookie_state_path: Optional[Path] = None,
         auto_solve_challenge: bool = True,
+        http_cache: Optional[HttpCache] = None,
+        load_cookies: bool = True,
     ) -> None:
         if not cfg.dip_api_key:
             raise ValueError("DIP_API_KEY is required")
         self.cfg = cfg
-        self.session = session or requests.Session()
+        self.session = session or _build_session()
         self.cookie_state_path = cookie_state_path or Path("state/cookies.json")
         self.auto_solve_challenge = auto_solve_challenge
         self._challenge_solved = False
-
-        # Try to load existing cookies on init
-        self._load_cached_cookies()
+        # Fetch pools call _get_json from many threads: one solves a challenge
+        # while the others wait, then retry with the cookies of the next
+        # generation instead of solving again
+        self._challenge_lock = threading.Lock()
+        self._cookie_generation = 0
+        # When set, the first page of a request carries If-None-Match /
+        # If-Modified-Since and a 304 ends pagination with no pages (callers
+        # persist the dict)
+        self.http_cache = http_cache
+        # Keys of http_cache confirmed by a 304 or recorded by this client;
+        # others belong to requests no longer made and can be dropped
+        self.live_cache_keys: Set[str] = set()
+        # Shared by all threads using this client; update_db's direct
+        # session.get calls acquire it as well
+        self.rate_limiter = RateLimiter(cfg.dip_rate_per_sec)
+
+        # Loaded eagerly: update_db also sends requests through self.session
+        # directly, bypassing _get_json. load_cookies=False skips the state
+        # file, e.g. for tests or callers that inject cookies themselves.
+        if load_cookies:
+            self._load_cached_cookies()
 
     def _load_cached_cookies(self) -> bool:
         """Load cached cookies from state file if they exist and are fresh."""
@@ -76,146 +175,178 @@ class DipClient:
         self._challenge_solved = True
 
     def fetch_vorgang_kleine_anfrage_pages(
-        self, cursor: Optional[str] = None, fail_on_empty: bool = True
+        self,
+        cursor: Optional[str] = None,
+        fail_on_empty: bool = True,
+        since: Optional[str] = None,
     ) -> Iterator[Page]:
-        params = {
-            "f.vorgangstyp": "Kleine Anfrage",
-            "apikey": self.cfg.dip_api_key,
-            "size": str(self.cfg.page_size),
-        }
-
-        next_cursor = cursor
-        while True:
-            if next_cursor:
-                params["cursor"] = next_cursor
-            else:
-                params.pop("cursor", None)
-
-            data = self._get_json("/vorgang", params=params)
-            items = _extract_items(data)
-            next_cursor = _extract_cursor(data)
-
-            # Validate response - empty documents with numFound > 0 indicates auth issue
-            num_found = data.get("numFound", 0)
-            if fail_on_empty and not items and num_found > 0:
-                raise EmptyResponseError(
-                    f"API returned empty documents but numFound={num_found}. "
-                    "This usually means the Enodia cookie is invalid or expired. "
-                    "Run: crawlify solve-challenge --visible"
-                )
-
-            yield Page(items=items, cursor=next_cursor, raw=data)
-
-            if not next_cursor:
-                break
+        params = {"f.vorgangstyp": "Kleine Anfrage"}
+        if since:
+            # Only vorgänge updated at/after this timestamp (keyset resume)
+            params["f.aktualisiert.start"] = since
+        return self._paginate("/vorgang", params, cursor, fail_on_empty)
 
     def fetch_drucksache_pages(
-        self, params: Dict[str, str], cursor: Optional[str] = None, fail_on_empty: bool = True
+        self, params: Dict[str, Any], cursor: Optional[str] = None, fail_on_empty: bool = True
     ) -> Iterator[Page]:
-        base_params = {
-            "apikey": self.cfg.dip_api_key,
-            "size": str(self.cfg.page_size),
-        }
-        base_params.update(params)
-
-        next_cursor = cursor
-        while True:
-            if next_cursor:
-                base_params["cursor"] = next_cursor
-            else:
-                base_params.pop("cursor", None)
-
-            data = self._get_json("/drucksache", params=base_params)
-            items = _extract_items(data)
-            next_cursor = _extract_cursor(data)
-
-            # Validate response
-            num_found = data.get("numFound", 0)
-            if fail_on_empty and not items and num_found > 0:
-                raise EmptyResponseError(
-                    f"API returned empty documents but numFound={num_found}. "
-                    "Run: crawlify solve-challenge --visible"
-                )
-
-            yield Page(items=items, cursor=next_cursor, raw=data)
-
-            if not next_cursor:
-                break
+        return self._paginate("/drucksache", params, cursor, fail_on_empty)
 
     def fetch_drucksache_text_pages(
-        self, params: Dict[str, str], cursor: Optional[str] = None, fail_on_empty: bool = True
+        self, params: Dict[str, Any], cursor: Optional[str] = None, fail_on_empty: bool = True
+    ) -> Iterator[Page]:
+        return self._paginate("/drucksache-text", params, cursor, fail_on_empty)
+
+    def _paginate(
+        self, path: str, params: Dict[str, Any], cursor: Optional[str], fail_on_empty: bool
     ) -> Iterator[Page]:
         base_params = {
             "apikey": self.cfg.dip_api_key,
             "size": str(self.cfg.page_size),
         }
         base_params.update(params)
+        # Only a fresh request's first page is conditional: its 304 means the
+        # whole result is unchanged, while later pages always follow the cursor
+        cache_key = None
+        if self.http_cache is not None and not cursor:
+            cache_key = _cache_key(path, base_params)
 
         next_cursor = cursor
         while True:
+            request_cursor = next_cursor
             if next_cursor:
                 base_params["cursor"] = next_cursor
             else:
                 base_params.pop("cursor", None)
 
-            data = self._get_json("/drucksache-text", params=base_params)
+            headers = self._conditional_headers(cache_key)
+            data, resp_headers = self._get_json(path, params=base_params, headers=headers)
+            if data is None:
+                self.live_cache_keys.add(cache_key)
+                return  # 304 Not Modified
             items = _extract_items(data)
             next_cursor = _extract_cursor(data)
-
-            # Validate response
-            num_found = data.get("numFound", 0)
-            if fail_on_empty and not items and num_found > 0:
-                raise EmptyResponseError(
-                    f"API returned empty documents but numFound={num_found}. "
-                    "Run: crawlify solve-challenge --visible"
+            if fail_on_empty:
+                _check_not_empty(data, items)
+
+            validators = None
+            if cache_key is not None and not next_cursor:
+                # Single-page result: safe to skip wholesale on a rerun
+                validators = (
+                    cache_key, resp_headers.get("ETag"), resp_headers.get("Last-Modified")
                 )
+            cache_key = None
+            yield Page(items=items, cursor=next_cursor, raw=data, validators=validators)
 
-            yield Page(items=items, cursor=next_cursor, raw=data)
-
-            if not next_cursor:
+            # DIP repeats the last cursor once all documents are delivered
+            if not next_cursor or next_cursor == request_cursor:
                 break
 
-    def _get_json(self, path: str, params: Dict[str, str]) -> Dict[str, Any]:
+    def _get_json(
+        self, path: str, params: Dict[str, Any], headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Mapping[str, str]]:
+        """GET with retries; returns (payload, response headers), payload None on 304."""
         url = f"{self.cfg.dip_base_url.rstrip('/')}{path}"
-        last_err: Optional[Exception] = None
-
-        for attempt in range(self.cfg.max_retries + 1):
+        attempt = 0
+        while True:
+            generation = self._cookie_generation
             try:
+                self.rate_limiter.acquire()
                 resp = self.session.get(
-                    url, params=params, timeout=self.cfg.request_timeout_s
+                    url, params=params, headers=headers, timeout=self.cfg.request_timeout_s
                 )
 
                 # Check if we got redirected to an Enodia challenge
                 if ENODIA_CHALLENGE_PATH in resp.url:
-                    if not self.auto_solve_challenge:
-                        raise RuntimeError(
-                            f"Enodia bot challenge detected at {resp.url}. "
-                            "Run 'crawlify solve-challenge' to solve it manually, "
-                            "or enable auto_solve_challenge."
-                        )
-                    if self._challenge_solved:
-                        # Already tried solving once this session, don't loop
-                        raise RuntimeError(
-                            "Enodia challenge persists after solving. "
-                            "The challenge may require manual intervention."
-                        )
-                    self._handle_challenge(resp.url)
-                    # Retry the request with new cookies
+                    self._solve_challenge_once(resp.url, generation)
+                    # Retry the request with new cookies (not counted as an attempt)
                     continue
 
+                self.rate_limiter.observe(resp.status_code)
                 if resp.status_code in RETRY_STATUS_CODES:
                     raise requests.HTTPError(
                         f"retryable status: {resp.status_code}", response=resp
                     )
+                if resp.status_code == 304:
+                    return None, resp.headers
                 resp.raise_for_status()
-                return resp.json()
+                return orjson.loads(resp.content), resp.headers
             except (requests.RequestException, ValueError) as err:
-                last_err = err
                 if attempt >= self.cfg.max_retries:
-                    break
-                _sleep_backoff(self.cfg.backoff_base_s, attempt)
-
-        raise RuntimeError("DIP request failed") from last_err
+                    raise RuntimeError("DIP request failed") from err
+                retry_after = _retry_after_s(err)
+                if retry_after is not None:
+                    self.rate_limiter.pause(retry_after)
+                    time.sleep(retry_after)
+                else:
+                    _sleep_backoff(self.cfg.backoff_base_s, attempt)
+                attempt += 1
+
+    def _solve_challenge_once(self, challenge_url: str, generation: int) -> None:
+        """Solve a challenge hit by a request sent with cookie `generation`."""
+        if not self.auto_solve_challenge:
+            raise RuntimeError(
+                f"Enodia bot challenge detected at {challenge_url}. "
+                "Run 'crawlify solve-challenge' to solve it manually, "
+                "or enable auto_solve_challenge."
+            )
+        with self._challenge_lock:
+            if generation != self._cookie_generation:
+                return  # solved by another thread while this request was in flight
+            if self._challenge_solved:
+                # Already tried solving once this session, don't loop
+                raise RuntimeError(
+                    "Enodia challenge persists after solving. "
+                    "The challenge may require manual intervention."
+                )
+            self._handle_challenge(challenge_url)
+            self._cookie_generation += 1
+
+    def _conditional_headers(self, cache_key: Optional[str]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if cache_key is None:
+            return headers
+        etag, last_modified = self.http_cache.get(cache_key, (None, None))
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def remember_validators(self, page: Page) -> None:
+        """Record `page`'s validators so a rerun of its request may get a 304.
+
+        Call only after the page's items are stored: a 304 skips the request.
+        """
+        if self.http_cache is None or page.validators is None:
+            return
+        cache_key, etag, last_modified = page.validators
+        if etag or last_modified:
+            self.http_cache[cache_key] = (etag, last_modified)
+            self.live_cache_keys.add(cache_key)
+
+
+def _cache_key(path: str, params: Dict[str, Any]) -> str:
+    # The API key is not part of the resource identity
+    items = sorted((k, v) for k, v in params.items() if k != "apikey")
+    return f"{path}?{urlencode(items, doseq=True)}"
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + _KEEPALIVE_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _build_session() -> requests.Session:
+    # Retries stay in _get_json (Enodia handling, backoff), so the adapter
+    # only provides connection pooling.
+    session = requests.Session()
+    adapter = _KeepAliveAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
 def _sleep_backoff(base_s: float, attempt: int) -> None:
@@ -225,6 +356,29 @@ def _sleep_backoff(base_s: float, attempt: int) -> None:
     time.sleep(delay)
 
 
+def _retry_after_s(err: Exception) -> Optional[float]:
+    # Only the delay-seconds form of Retry-After; HTTP dates fall back to backoff
+    resp = getattr(err, "response", None)
+    if resp is None or resp.status_code != 429:
+        return None
+    value = resp.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _check_not_empty(payload: Dict[str, Any], items: List[Dict[str, Any]]) -> None:
+    # Empty documents with numFound > 0 indicate an auth issue
+    num_found = payload.get("numFound", 0)
+    if not items and num_found > 0:
+        raise EmptyResponseError(
+            f"API returned empty documents but numFound={num_found}. "
+            "This usually means the Enodia cookie is invalid or expired. "
+            "Run: crawlify solve-challenge --visible"
+        )
+
+
 def _extract_items(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
     # DIP payloads may evolve; try common keys first.
     for key in ("documents", "vorgang", "results", "data", "items"):
@@ -250,5 +404,21 @@ def _extract_cursor(payload: Dict[str, Any]) -> Optional[str]:
 def write_page_raw(page: Page, out_dir: Path, index: int, prefix: str) -> Path:
     out_dir.mkdir(parents=True, exist_ok=True)
     path = out_dir / f"{prefix}_page_{index:05d}.json"
-    path.write_text(json.dumps(page.raw, ensure_ascii=True, indent=2))
+    data = orjson.dumps(page.raw, option=orjson.OPT_APPEND_NEWLINE)
+
+    # Re-runs often re-observe identical pages; skip the write when the
+    # sidecar hash matches what is already on disk.
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    hash_path = path.with_suffix(".hash")
+    if path.exists() and hash_path.exists() and hash_path.read_text() == digest:
+        return path
+
+    _write_atomic(path, data)
+    _write_atomic(hash_path, digest.encode("ascii"))
     return path
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
@@ -1,22 +1,43 @@
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
-from typing import Iterable, List
+from functools import lru_cache
+from typing import Any, Iterable, Optional, Tuple
+
+# Distinct query strings whose vectors a provider keeps for reuse
+QUERY_CACHE_SIZE = 1024
+
+# Texts per forward pass; larger batches mostly pay off on a GPU
+ENCODE_BATCH_SIZE = 64
 
 
 @dataclass(frozen=True)
 class EmbeddingResult:
-    vectors: List[List[float]]
+    vectors: Any  # numpy.ndarray (N, d) float32, or a sequence of sequences
     model: str
 
 
 class EmbeddingProvider:
+    def __init__(self) -> None:
+        # Per-instance LRU: a cache on the class method would keep every
+        # provider (and its model) alive for the life of the process
+        self._query_cache = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._embed_query)
+
     def embed(self, texts: Iterable[str]) -> EmbeddingResult:
         raise NotImplementedError
 
+    def embed_query(self, text: str) -> Tuple[float, ...]:
+        """Embed one search query; repeated queries skip the model (LRU)."""
+        return self._query_cache(text)
+
+    def _embed_query(self, text: str) -> Tuple[float, ...]:
+        return tuple(float(x) for x in self.embed([text]).vectors[0])
+
 
 class SentenceTransformerProvider(EmbeddingProvider):
-    def __init__(self, model_name: str) -> None:
+    def __init__(self, model_name: str, device: Optional[str] = None) -> None:
+        super().__init__()
         self.model_name = model_name
         try:
             from sentence_transformers import SentenceTransformer
@@ -24,9 +45,31 @@ class SentenceTransformerProvider(EmbeddingProvider):
             raise RuntimeError(
                 "sentence-transformers not installed. Install to use this provider."
             ) from exc
-        self._model = SentenceTransformer(model_name)
+        self.device = device or self._detect_device()
+        self._model = SentenceTransformer(model_name, device=self.device)
+
+    @staticmethod
+    def _detect_device() -> str:
+        """Prefer CUDA, then Apple MPS; on CPU cap torch's thread pool."""
+        import torch
+
+        if torch.cuda.is_available():
+            return "cuda"
+        mps = getattr(torch.backends, "mps", None)
+        if mps is not None and mps.is_available():
+            return "mps"
+        # Beyond ~8 threads small encoder models stop scaling on CPU
+        torch.set_num_threads(min(8, os.cpu_count() or 1))
+        return "cpu"
 
     def embed(self, texts: Iterable[str]) -> EmbeddingResult:
         text_list = list(texts)
-        vectors = self._model.encode(text_list, normalize_embeddings=True).tolist()
+        # Kept as the encoder's float32 matrix; pack_embedding reads rows as-is
+        vectors = self._model.encode(
+            text_list,
+            batch_size=ENCODE_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
         return EmbeddingResult(vectors=vectors, model=self.model_name)
@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+import queue
+import threading
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, List, Optional
 
 from .config import load_config
 from .dip_client import DipClient, EmptyResponseError, Page, write_page_raw
+from .normalize import now_iso
 from .storage import CursorState, load_cursor_state, save_cursor_state
 
 # Callback type: (page_index, page, total_from_api) -> None
 ProgressCallback = Callable[[int, Page, Optional[int]], None]
 
+# Pages waiting for the writer thread; the bound stops a slow disk from
+# letting fetched pages pile up in memory
+WRITE_QUEUE_PAGES = 4
+
 
 def ingest_vorgang_kleine_anfrage(
     raw_dir: Path,
@@ -22,16 +29,62 @@ def ingest_vorgang_kleine_anfrage(
 
     state = load_cursor_state(state_path)
     cursor = start_cursor or state.cursor
+    # A saved cursor is only valid with the filter it was issued for (update_db
+    # shares this state file); an explicit start cursor is sent as given
+    since = state.since if not start_cursor and state.cursor else None
+
+    # Pages are persisted on a writer thread while the next one downloads;
+    # one FIFO consumer keeps each cursor saved after its own page
+    writes: queue.Queue = queue.Queue(maxsize=WRITE_QUEUE_PAGES)
+    errors: List[BaseException] = []
+    writer = threading.Thread(
+        target=_write_pages,
+        args=(writes, raw_dir, state_path, since, errors),
+        name="page-writer",
+        daemon=True,
+    )
+    writer.start()
 
     total_pages = 0
-    for idx, page in enumerate(client.fetch_vorgang_kleine_anfrage_pages(cursor=cursor)):
-        write_page_raw(page, raw_dir, idx, prefix="vorgang")
-        save_cursor_state(state_path, CursorState(cursor=page.cursor))
-        total_pages += 1
+    try:
+        pages = client.fetch_vorgang_kleine_anfrage_pages(cursor=cursor, since=since)
+        for idx, page in enumerate(pages):
+            if errors:
+                break
+            writes.put((idx, page))
+            total_pages += 1
 
-        # Report progress
-        if on_progress:
-            total_from_api = page.raw.get("numFound")
-            on_progress(idx, page, total_from_api)
+            # Report progress
+            if on_progress:
+                total_from_api = page.raw.get("numFound")
+                on_progress(idx, page, total_from_api)
+    finally:
+        writes.put(None)
+        writer.join()
+    if errors:
+        raise errors[0]
 
     return total_pages
+
+
+def _write_pages(
+    writes: queue.Queue,
+    raw_dir: Path,
+    state_path: Path,
+    since: Optional[str],
+    errors: List[BaseException],
+) -> None:
+    while True:
+        item = writes.get()
+        if item is None:
+            return
+        if errors:
+            continue  # keep draining so the fetch loop never blocks on put()
+        idx, page = item
+        try:
+            write_page_raw(page, raw_dir, idx, prefix="vorgang")
+            save_cursor_state(
+                state_path, CursorState(cursor=page.cursor, saved_at=now_iso(), since=since)
+            )
+        except BaseException as exc:
+            errors.append(exc)
@@ -1,20 +1,69 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, Optional
 
+StrGetter = Callable[[Dict[str, Any]], Optional[str]]
 
-def normalize_vorgang(item: Dict[str, Any]) -> Dict[str, Any]:
-    vorgang_id = _first_str(item, ["id", "vorgang_id", "vorgangId"])
-    vorgangstyp = _first_str(item, ["vorgangstyp", "vorgangsTyp", "type"])
-    titel = _first_str(item, ["titel", "title", "kurzbezeichnung"])
-    datum = _first_str(item, ["datum", "date", "datum_aktualisierung"])
-    beratungsstand = _first_str(item, ["beratungsstand", "status", "stand"])
-    legislature = _first_str(item, ["wahlperiode", "legislature"])
+
+def _str_getter(*keys: str) -> StrGetter:
+    """Build an accessor returning the first non-blank string under `keys`.
+
+    The candidate keys are bound once at import time, so per-item
+    normalization does no list allocation or key-list setup.
+    """
+
+    def get(d: Dict[str, Any]) -> Optional[str]:
+        for key in keys:
+            val = d.get(key)
+            # Truthiness first rejects missing keys without a call; isspace()
+            # matches "blank after strip()" without building a new string
+            if val and isinstance(val, str) and not val.isspace():
+                return val
+        return None
+
+    return get
+
+
+# DIP field names have varied over time; each accessor tries them in order.
+_vorgang_id = _str_getter("id", "vorgang_id", "vorgangId")
+_vorgangstyp = _str_getter("vorgangstyp", "vorgangsTyp", "type")
+_vorgang_titel = _str_getter("titel", "title", "kurzbezeichnung")
+_vorgang_datum = _str_getter("datum", "date", "datum_aktualisierung")
+_beratungsstand = _str_getter("beratungsstand", "status", "stand")
+_legislature = _str_getter("wahlperiode", "legislature")
+_ressort = _str_getter("ressort", "zustandigkeit", "federfuehrung")
+_abstrakt = _str_getter("abstrakt", "abstract", "kurztext")
+
+_drucksache_id = _str_getter("id", "drucksache_id", "drucksacheId")
+_drucksache_titel = _str_getter("titel", "title")
+_drucksachetyp = _str_getter("drucksachetyp", "dokumentart", "typ")
+_drucksache_nummer = _str_getter("drucksache_nr", "drucksache_nummer", "dokumentnummer")
+_drucksache_datum = _str_getter("datum", "date")
+_dok_url = _str_getter("url", "dok_url", "link")
+_dokument_typ = _str_getter("typ", "type", "mime")
+
+_text_drucksache_id = _str_getter("drucksache_id", "drucksacheId", "id")
+_volltext = _str_getter("text", "volltext", "content")
+_text_format = _str_getter("format", "text_format", "mime")
+
+
+def normalize_vorgang(item: Dict[str, Any], updated_at: Optional[str] = None) -> Dict[str, Any]:
+    """Map a DIP Vorgang to a vorgang row.
+
+    Batch callers pass one ``updated_at`` (see now_iso) for all items
+    instead of formatting the clock per record.
+    """
+    vorgang_id = _vorgang_id(item)
+    vorgangstyp = _vorgangstyp(item)
+    titel = _vorgang_titel(item)
+    datum = _vorgang_datum(item)
+    beratungsstand = _beratungsstand(item)
+    legislature = _legislature(item)
     initiatoren = item.get("initiatoren") or item.get("initiator") or []
-    ressort = _first_str(item, ["ressort", "zustandigkeit", "federfuehrung"])
+    ressort = _ressort(item)
     schlagworte = item.get("schlagworte") or item.get("keywords") or []
-    abstrakt = _first_str(item, ["abstrakt", "abstract", "kurztext"])
+    abstrakt = _abstrakt(item)
 
     embedding_text = _join_non_empty([titel, abstrakt])
 
@@ -34,19 +83,21 @@ def normalize_vorgang(item: Dict[str, Any]) -> Dict[str, Any]:
         "embedding_json": None,
         "embedding_version": None,
         "raw_json": item,
-        "updated_at": _now_iso(),
+        "updated_at": updated_at or now_iso(),
     }
 
 
-def normalize_drucksache(item: Dict[str, Any], vorgang_id: str) -> Dict[str, Any]:
-    drucksache_id = _first_str(item, ["id", "drucksache_id", "drucksacheId"])
-    titel = _first_str(item, ["titel", "title"])
-    drucksachetyp = _first_str(item, ["drucksachetyp", "dokumentart", "typ"])
-    drucksache_nummer = _first_str(item, ["drucksache_nr", "drucksache_nummer", "dokumentnummer"])
-    datum = _first_str(item, ["datum", "date"])
+def normalize_drucksache(
+    item: Dict[str, Any], vorgang_id: str, updated_at: Optional[str] = None
+) -> Dict[str, Any]:
+    drucksache_id = _drucksache_id(item)
+    titel = _drucksache_titel(item)
+    drucksachetyp = _drucksachetyp(item)
+    drucksache_nummer = _drucksache_nummer(item)
+    datum = _drucksache_datum(item)
     dokument = item.get("dokument") or {}
-    dok_url = _first_str(dokument, ["url", "dok_url", "link"])
-    dokument_typ = _first_str(dokument, ["typ", "type", "mime"])
+    dok_url = _dok_url(dokument)
+    dokument_typ = _dokument_typ(dokument)
 
     return {
         "drucksache_id": drucksache_id or "",
@@ -58,32 +109,26 @@ def normalize_drucksache(item: Dict[str, Any], vorgang_id: str) -> Dict[str, Any
         "dok_url": dok_url,
         "dokument_typ": dokument_typ,
         "raw_json": item,
-        "updated_at": _now_iso(),
+        "updated_at": updated_at or now_iso(),
     }
 
 
-def normalize_drucksache_text(item: Dict[str, Any]) -> Dict[str, Any]:
-    drucksache_id = _first_str(item, ["drucksache_id", "drucksacheId", "id"])
-    volltext = _first_str(item, ["text", "volltext", "content"])
-    text_format = _first_str(item, ["format", "text_format", "mime"])
+def normalize_drucksache_text(
+    item: Dict[str, Any], updated_at: Optional[str] = None
+) -> Dict[str, Any]:
+    drucksache_id = _text_drucksache_id(item)
+    volltext = _volltext(item)
+    text_format = _text_format(item)
 
     return {
         "drucksache_id": drucksache_id or "",
         "volltext": volltext,
         "text_format": text_format,
         "raw_json": item,
-        "updated_at": _now_iso(),
+        "updated_at": updated_at or now_iso(),
     }
 
 
-def _first_str(d: Dict[str, Any], keys: List[str]) -> Optional[str]:
-    for key in keys:
-        val = d.get(key)
-        if isinstance(val, str) and val.strip():
-            return val
-    return None
-
-
 def _join_non_empty(parts: Iterable[Optional[str]]) -> Optional[str]:
     cleaned = [p.strip() for p in parts if isinstance(p, str) and p.strip()]
     if not cleaned:
@@ -91,5 +136,5 @@ def _join_non_empty(parts: Iterable[Optional[str]]) -> Optional[str]:
     return "\n\n".join(cleaned)
 
 
-def _now_iso() -> str:
+def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -6,6 +6,9 @@ import time
 from dataclasses import dataclass, field
 from typing import Optional
 
+# Minimum seconds between status line redraws; print_summary has the final counts
+STATUS_INTERVAL_S = 0.25
+
 
 @dataclass
 class FetchProgress:
@@ -16,14 +19,30 @@ class FetchProgress:
     items_done: int = 0
     start_time: float = field(default_factory=time.time)
     last_page_time: float = field(default_factory=time.time)
+    # Exponentially weighted moving average of seconds per page
+    page_time_ewma: float = 0.0
+    ewma_alpha: float = 0.3
+    last_status_time: float = 0.0
 
     def update(self, items_in_page: int, total_from_api: Optional[int] = None) -> None:
         """Update progress after fetching a page."""
+        now = time.time()
+        dt = now - self.last_page_time
+        if self.pages_done == 0:
+            self.page_time_ewma = dt
+        else:
+            self.page_time_ewma = self.ewma_alpha * dt + (1 - self.ewma_alpha) * self.page_time_ewma
         self.pages_done += 1
         self.items_done += items_in_page
         if total_from_api is not None:
             self.total_expected = total_from_api
-        self.last_page_time = time.time()
+        self.last_page_time = now
+
+    def next_page_exceeds(self, deadline: Optional[float]) -> bool:
+        """True if another page at the current pace would end after `deadline` (epoch seconds)."""
+        if deadline is None:
+            return False
+        return time.time() + self.page_time_ewma > deadline
 
     def elapsed(self) -> float:
         """Total elapsed time in seconds."""
@@ -59,8 +78,15 @@ class FetchProgress:
             mins = int((seconds % 3600) // 60)
             return f"{hours}h {mins}m"
 
-    def print_status(self) -> None:
-        """Print current status line (overwrites previous line)."""
+    def print_status(self, suffix: str = "") -> bool:
+        """Print current status line (overwrites previous line), at most every STATUS_INTERVAL_S.
+
+        ``suffix`` is appended to the line and skipped with it; returns whether it drew.
+        """
+        now = time.monotonic()
+        if now - self.last_status_time < STATUS_INTERVAL_S:
+            return False
+        self.last_status_time = now
         elapsed = self.elapsed()
         rate = self.items_per_second()
 
@@ -80,8 +106,9 @@ class FetchProgress:
 
         line = " ".join(parts)
         # Clear line and print status
-        sys.stdout.write(f"\r\033[K{line}")
+        sys.stdout.write(f"\r\033[K{line}{suffix}")
         sys.stdout.flush()
+        return True
 
     def print_summary(self) -> None:
         """Print final summary on new line."""
@@ -100,6 +127,7 @@ class NormalizeProgress:
     items_updated: int = 0
     items_skipped: int = 0
     start_time: float = field(default_factory=time.time)
+    last_status_time: float = 0.0
 
     def update(self, new: int = 0, updated: int = 0, skipped: int = 0) -> None:
         """Update counts after processing items."""
@@ -128,16 +156,24 @@ class NormalizeProgress:
             mins = int((seconds % 3600) // 60)
             return f"{hours}h {mins}m"
 
-    def print_status(self) -> None:
-        """Print current status line."""
+    def print_status(self, suffix: str = "") -> bool:
+        """Print current status line plus ``suffix``, at most every STATUS_INTERVAL_S.
+
+        Returns whether it drew.
+        """
+        now = time.monotonic()
+        if now - self.last_status_time < STATUS_INTERVAL_S:
+            return False
+        self.last_status_time = now
         total = self.items_new + self.items_updated + self.items_skipped
         if self.total_files > 0:
             pct = (self.files_done / self.total_files) * 100
             line = f"\r\033[K[{self.files_done}/{self.total_files}] ({pct:.0f}%) | {total:,} items processed"
         else:
             line = f"\r\033[K[{self.files_done} files] | {total:,} items processed"
-        sys.stdout.write(line)
+        sys.stdout.write(f"{line}{suffix}")
         sys.stdout.flush()
+        return True
 
     def print_summary(self) -> None:
         """Print final summary."""
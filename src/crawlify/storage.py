@@ -1,24 +1,37 @@
 from __future__ import annotations
 
-import json
+import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+import orjson
+
 
 @dataclass
 class CursorState:
     cursor: Optional[str]
+    # ISO timestamp of when the cursor was saved; stale cursors are dropped
+    saved_at: Optional[str] = None
+    # f.aktualisiert.start of the query the cursor came from; DIP cursors
+    # are only valid with the same filters, so a resume must resend it
+    since: Optional[str] = None
 
 
 def load_cursor_state(path: Path) -> CursorState:
     if not path.exists():
         return CursorState(cursor=None)
-    data = json.loads(path.read_text())
-    return CursorState(cursor=data.get("cursor"))
+    data = orjson.loads(path.read_bytes())
+    return CursorState(
+        cursor=data.get("cursor"), saved_at=data.get("saved_at"), since=data.get("since")
+    )
 
 
 def save_cursor_state(path: Path, state: CursorState) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    payload = {"cursor": state.cursor}
-    path.write_text(json.dumps(payload, ensure_ascii=True, indent=2))
+    payload = {"cursor": state.cursor, "saved_at": state.saved_at, "since": state.since}
+    # Write-then-rename: a crash mid-write leaves the previous cursor intact
+    # instead of a truncated file that would force a full re-crawl
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, path)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from crawlify.db import (
+    BackgroundWriter,
+    DbConfig,
+    connect,
+    get_max_aktualisiert,
+    init_db,
+    load_http_cache,
+    save_http_cache,
+    transaction,
+    upsert_vorgang_many,
+    vacuum_db,
+)
+from crawlify.normalize import normalize_vorgang
+
+
+def _conn(tmp_path: Path):
+    conn = connect(DbConfig(path=tmp_path / "test.sqlite"))
+    init_db(conn)
+    return conn
+
+
+def test_upsert_vorgang_many_is_idempotent(tmp_path: Path) -> None:
+    conn = _conn(tmp_path)
+    rows = [
+        normalize_vorgang({"id": "1", "vorgangstyp": "Kleine Anfrage", "titel": "A"}),
+        normalize_vorgang({"id": "2", "vorgangstyp": "Kleine Anfrage", "titel": "B"}),
+    ]
+    upsert_vorgang_many(conn, rows)
+    rows[0]["titel"] = "A2"
+    upsert_vorgang_many(conn, rows)
+
+    titles = conn.execute("SELECT titel FROM vorgang ORDER BY vorgang_id").fetchall()
+    assert [r["titel"] for r in titles] == ["A2", "B"]
+
+
+def test_transaction_rolls_back_on_error(tmp_path: Path) -> None:
+    conn = _conn(tmp_path)
+    row = normalize_vorgang({"id": "1", "vorgangstyp": "Kleine Anfrage"})
+    with pytest.raises(RuntimeError):
+        with transaction(conn):
+            upsert_vorgang_many(conn, [row])
+            raise RuntimeError("boom")
+
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM vorgang").fetchone()[0] == 0
+
+
+def test_get_max_aktualisiert_reads_raw_json(tmp_path: Path) -> None:
+    conn = _conn(tmp_path)
+    assert get_max_aktualisiert(conn) is None
+
+    rows = [
+        normalize_vorgang(
+            {"id": str(i), "vorgangstyp": "Kleine Anfrage", "aktualisiert": ts}
+        )
+        for i, ts in enumerate(["2024-03-01T10:00:00+01:00", "2024-03-02T09:00:00+01:00"])
+    ]
+    upsert_vorgang_many(conn, rows)
+    assert get_max_aktualisiert(conn) == "2024-03-02T09:00:00+01:00"
+
+
+def test_background_writer_commits_before_callbacks(tmp_path: Path) -> None:
+    conn = connect(DbConfig(path=tmp_path / "test.sqlite"), check_same_thread=False)
+    init_db(conn)
+    seen = []
+
+    with BackgroundWriter(conn, batch_rows=2) as writer:
+        for i in range(3):
+            writer.put("vorgang", [normalize_vorgang({"id": str(i), "vorgangstyp": "Kleine Anfrage"})])
+            writer.after_commit(
+                lambda: seen.append(conn.execute("SELECT COUNT(*) FROM vorgang").fetchone()[0])
+            )
+
+    assert conn.execute("SELECT COUNT(*) FROM vorgang").fetchone()[0] == 3
+    assert seen[-1] == 3
+    assert all(n > 0 for n in seen)
+
+
+def test_vorgang_fts_follows_upserts(tmp_path: Path) -> None:
+    conn = _conn(tmp_path)
+    row = normalize_vorgang({"id": "1", "vorgangstyp": "Kleine Anfrage", "titel": "Windkraft"})
+    upsert_vorgang_many(conn, [row])
+    row["titel"] = "Solarenergie"
+    upsert_vorgang_many(conn, [row])
+
+    def matches(term: str) -> int:
+        sql = "SELECT COUNT(*) FROM vorgang_fts WHERE vorgang_fts MATCH ?"
+        return conn.execute(sql, (f'"{term}"',)).fetchone()[0]
+
+    assert matches("solar") == 1
+    assert matches("windkraft") == 0
+
+
+def test_vorgang_fts_survives_vacuum(tmp_path: Path) -> None:
+    conn = _conn(tmp_path)
+    rows = [
+        normalize_vorgang({"id": str(i), "vorgangstyp": "Kleine Anfrage", "titel": f"Thema {i}"})
+        for i in range(3)
+    ]
+    upsert_vorgang_many(conn, rows)
+    with transaction(conn):
+        conn.execute("DELETE FROM vorgang WHERE vorgang_id = '0'")
+    vacuum_db(conn)
+
+    sql = (
+        "SELECT v.vorgang_id FROM vorgang_fts JOIN vorgang v ON v.rowid = vorgang_fts.rowid "
+        "WHERE vorgang_fts MATCH ?"
+    )
+    assert [r[0] for r in conn.execute(sql, ('"thema 2"',))] == ["2"]
+
+
+def test_save_http_cache_drops_keys_not_saved_again(tmp_path: Path) -> None:
+    conn = _conn(tmp_path)
+    save_http_cache(conn, {"a": ('"1"', None), "b": ('"2"', None)})
+    save_http_cache(conn, {"b": ('"3"', None)})
+    assert load_http_cache(conn) == {"b": ('"3"', None)}
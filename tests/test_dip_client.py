@@ -1,22 +1,32 @@
 from __future__ import annotations
 
-from typing import Dict, List
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
 
 import requests
 
 from crawlify.config import Config
-from crawlify.dip_client import DipClient
+from crawlify.dip_client import DipClient, Page, RateLimiter, write_page_raw
 
 
 class FakeResponse:
-    def __init__(self, status_code: int, payload: Dict):
+    def __init__(self, status_code: int, payload: Dict, headers: Optional[Dict] = None):
         self.status_code = status_code
         self._payload = payload
+        self.url = "https://example.test/api/v1/vorgang"
+        self.headers = headers or {}
 
     def raise_for_status(self) -> None:
         if self.status_code >= 400:
             raise requests.HTTPError(response=self)
 
+    @property
+    def content(self) -> bytes:
+        return json.dumps(self._payload).encode()
+
     def json(self) -> Dict:
         return self._payload
 
@@ -25,10 +35,12 @@ class FakeSession:
     def __init__(self, responses: List[FakeResponse]):
         self._responses = responses
         self.calls = 0
+        self.headers: List[Optional[Dict]] = []
 
-    def get(self, url, params=None, timeout=None):
+    def get(self, url, params=None, headers=None, timeout=None):
         resp = self._responses[self.calls]
         self.calls += 1
+        self.headers.append(headers)
         return resp
 
 
@@ -48,7 +60,7 @@ def test_pagination_cursor_stops() -> None:
         FakeResponse(200, {"documents": [{"id": 1}], "cursor": "abc"}),
         FakeResponse(200, {"documents": [{"id": 2}], "cursor": None}),
     ]
-    client = DipClient(_cfg(), session=FakeSession(responses))
+    client = DipClient(_cfg(), session=FakeSession(responses), load_cookies=False)
     pages = list(client.fetch_vorgang_kleine_anfrage_pages())
     assert len(pages) == 2
     assert pages[0].items[0]["id"] == 1
@@ -57,9 +69,121 @@ def test_pagination_cursor_stops() -> None:
 
 def test_retryable_status_raises_after_max_retries() -> None:
     responses = [FakeResponse(500, {"error": "fail"})]
-    client = DipClient(_cfg(), session=FakeSession(responses))
+    client = DipClient(_cfg(), session=FakeSession(responses), load_cookies=False)
     try:
         list(client.fetch_vorgang_kleine_anfrage_pages())
         assert False, "expected error"
     except RuntimeError:
         assert True
+
+
+def test_not_modified_response_skips_recorded_result() -> None:
+    responses = [
+        FakeResponse(200, {"documents": [{"id": 1}], "cursor": None}, headers={"ETag": '"v1"'}),
+        FakeResponse(304, {}),
+    ]
+    session = FakeSession(responses)
+    client = DipClient(_cfg(), session=session, http_cache={}, load_cookies=False)
+
+    (page,) = client.fetch_drucksache_text_pages({"f.id": ["1"]})
+    client.remember_validators(page)
+    assert list(client.fetch_drucksache_text_pages({"f.id": ["1"]})) == []
+    assert session.headers[1] == {"If-None-Match": '"v1"'}
+    assert client.live_cache_keys == set(client.http_cache)
+
+
+def test_rerun_after_failed_later_page_fetches_all_pages() -> None:
+    def first_page() -> FakeResponse:
+        return FakeResponse(
+            200, {"documents": [{"id": 1}], "cursor": "c1"}, headers={"ETag": '"v1"'}
+        )
+
+    responses = [
+        first_page(),
+        FakeResponse(500, {}),
+        first_page(),
+        FakeResponse(200, {"documents": [{"id": 2}], "cursor": "c1"}),
+    ]
+    session = FakeSession(responses)
+    client = DipClient(_cfg(), session=session, http_cache={}, load_cookies=False)
+
+    pages = client.fetch_drucksache_text_pages({"f.id": ["1", "2"]})
+    first = next(pages)
+    try:
+        next(pages)
+        assert False, "expected error"
+    except RuntimeError:
+        pass
+    # Multi-page results carry no validators, so nothing is recorded
+    client.remember_validators(first)
+    assert first.validators is None and client.http_cache == {}
+
+    rerun = list(client.fetch_drucksache_text_pages({"f.id": ["1", "2"]}))
+    assert [item["id"] for page in rerun for item in page.items] == [1, 2]
+    assert session.headers[2] == {}
+
+
+def test_write_page_raw_skips_unchanged_page(tmp_path) -> None:
+    page = Page(items=[{"id": 1}], cursor=None, raw={"documents": [{"id": 1}]})
+    path = write_page_raw(page, tmp_path, 0, prefix="vorgang")
+    mtime = path.stat().st_mtime_ns
+
+    os.utime(path, ns=(mtime - 10**9, mtime - 10**9))
+    write_page_raw(page, tmp_path, 0, prefix="vorgang")
+    assert path.stat().st_mtime_ns == mtime - 10**9
+
+    changed = Page(items=[{"id": 2}], cursor=None, raw={"documents": [{"id": 2}]})
+    write_page_raw(changed, tmp_path, 0, prefix="vorgang")
+    assert b'"id":2' in path.read_bytes()
+
+
+def test_rate_limiter_spaces_requests_after_burst() -> None:
+    limiter = RateLimiter(rate=50, burst=2)
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+    # Two tokens from the burst, two more refilled at 50/s
+    assert time.monotonic() - start >= 0.035
+
+
+def test_rate_limiter_halves_on_throttle_and_recovers() -> None:
+    limiter = RateLimiter(rate=10)
+    limiter.observe(429)
+    limiter.observe(503)
+    assert limiter.rate == 2.5
+    limiter.observe(500)
+    assert limiter.rate == 2.5
+    for _ in range(100):
+        limiter.observe(200)
+    assert limiter.rate == 10
+
+
+def test_concurrent_challenges_are_solved_once() -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    solved = threading.Event()
+    solves = []
+
+    class ChallengeSession:
+        def get(self, url, params=None, headers=None, timeout=None):
+            if solved.is_set():
+                return FakeResponse(200, {"documents": [{"id": 1}], "cursor": None})
+            resp = FakeResponse(200, {})
+            resp.url = "https://example.test/.enodia/challenge?redirect=x"
+            return resp
+
+    client = DipClient(_cfg(), session=ChallengeSession(), load_cookies=False)
+
+    def handle_challenge(url: str) -> None:
+        solves.append(url)
+        time.sleep(0.05)  # let the other threads pile up on the challenge
+        solved.set()
+
+    client._handle_challenge = handle_challenge
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(
+            executor.map(lambda _: list(client.fetch_drucksache_text_pages({})), range(8))
+        )
+
+    assert len(solves) == 1
+    assert all(pages[0].items == [{"id": 1}] for pages in results)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from crawlify import ingest
+from crawlify.dip_client import Page
+from crawlify.storage import CursorState, load_cursor_state, save_cursor_state
+
+
+def test_saved_cursor_is_resumed_with_its_filter(tmp_path: Path, monkeypatch) -> None:
+    calls = []
+
+    class FakeClient:
+        def __init__(self, cfg) -> None:
+            pass
+
+        def fetch_vorgang_kleine_anfrage_pages(self, cursor=None, since=None):
+            calls.append((cursor, since))
+            yield Page(items=[{"id": "1"}], cursor="c2", raw={"documents": [{"id": "1"}]})
+
+    monkeypatch.setattr(ingest, "DipClient", FakeClient)
+    monkeypatch.setattr(ingest, "load_config", lambda: None)
+    state_path = tmp_path / "cursor.json"
+    save_cursor_state(
+        state_path, CursorState(cursor="c1", saved_at="2024-01-01T00:00:00", since="2024-01-01")
+    )
+
+    ingest.ingest_vorgang_kleine_anfrage(tmp_path / "raw", state_path)
+
+    assert calls == [("c1", "2024-01-01")]
+    state = load_cursor_state(state_path)
+    assert (state.cursor, state.since) == ("c2", "2024-01-01")
+    assert state.saved_at is not None
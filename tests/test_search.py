@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from crawlify.cli import main
+from crawlify.db import DbConfig, connect, init_db, upsert_vorgang_many
+from crawlify.normalize import normalize_vorgang
+from crawlify.search import (
+    cosine_sim,
+    filter_rows,
+    load_embeddings,
+    pack_embedding,
+    rank_by_similarity,
+)
+
+pytest.importorskip("numpy")
+
+
+def test_rank_by_similarity_matches_cosine_sim(tmp_path: Path) -> None:
+    conn = connect(DbConfig(path=tmp_path / "test.sqlite"))
+    init_db(conn)
+    vectors = {"1": [1.0, 0.0, 0.0], "2": [0.6, 0.8, 0.0], "3": [0.0, 0.0, 2.0], "4": [1.0, 1.0]}
+    upsert_vorgang_many(
+        conn,
+        [normalize_vorgang({"id": vid, "vorgangstyp": "Kleine Anfrage"}) for vid in vectors],
+    )
+    for vid, vec in vectors.items():
+        conn.execute(
+            "UPDATE vorgang SET embedding_json = ? WHERE vorgang_id = ?", (json.dumps(vec), vid)
+        )
+
+    items = load_embeddings(conn)
+    query = [0.9, 0.3, 0.1]
+    ranked = rank_by_similarity(query, items, limit=3)
+
+    expected = sorted(vectors, key=lambda vid: cosine_sim(query, vectors[vid]), reverse=True)
+    assert [vid for vid, _, _ in ranked] == expected[:3]
+    for vid, score, _ in ranked:
+        assert score == pytest.approx(cosine_sim(query, vectors[vid]), abs=1e-6)
+
+
+def test_load_embeddings_reuses_matrix_cache(tmp_path: Path) -> None:
+    conn = connect(DbConfig(path=tmp_path / "test.sqlite"))
+    init_db(conn)
+    upsert_vorgang_many(
+        conn, [normalize_vorgang({"id": vid, "vorgangstyp": "Kleine Anfrage"}) for vid in "12"]
+    )
+    conn.execute("UPDATE vorgang SET embedding_json = '[1.0, 0.0]' WHERE vorgang_id = '1'")
+    cache_path = tmp_path / "test.embeddings.npy"
+
+    first = load_embeddings(conn, cache_path=cache_path)
+    assert cache_path.exists()
+    # Served from the cache: the JSON is no longer parsed
+    conn.execute("UPDATE vorgang SET embedding_json = 'not json' WHERE vorgang_id = '1'")
+    assert load_embeddings(conn, cache_path=cache_path).ids == first.ids
+
+    # A different set of embedded rows rebuilds it
+    conn.execute("UPDATE vorgang SET embedding_json = '[0.0, 1.0]'")
+    rebuilt = load_embeddings(conn, cache_path=cache_path)
+    assert sorted(rebuilt.ids) == ["1", "2"]
+    assert rank_by_similarity([0.0, 1.0], rebuilt, limit=1)[0][1] == pytest.approx(1.0)
+
+
+def test_ann_index_finds_nearest_neighbours(tmp_path: Path) -> None:
+    pytest.importorskip("faiss")
+    import numpy as np
+
+    from crawlify.search import EmbeddingMatrix, load_ann_index
+
+    vectors = np.eye(4, dtype=np.float32)
+    items = EmbeddingMatrix(ids=list("abcd"), vectors=vectors, metas=[{}] * 4)
+    path = tmp_path / "test.hnsw"
+    load_ann_index(items, path)
+    index = load_ann_index(items, path)
+
+    assert rank_by_similarity([0.0, 0.0, 1.0, 0.1], items, limit=1, index=index)[0][0] == "c"
+
+
+def test_rank_by_similarity_scores_only_filtered_rows(tmp_path: Path) -> None:
+    conn = connect(DbConfig(path=tmp_path / "test.sqlite"))
+    init_db(conn)
+    upsert_vorgang_many(
+        conn,
+        [
+            normalize_vorgang({"id": "1", "vorgangstyp": "Kleine Anfrage", "ressort": "A"}),
+            normalize_vorgang({"id": "2", "vorgangstyp": "Kleine Anfrage", "ressort": "B"}),
+            normalize_vorgang({"id": "3", "vorgangstyp": "Kleine Anfrage", "ressort": "B"}),
+        ],
+    )
+    for vid, vec in {"1": "[1.0, 0.0]", "2": "[0.0, 1.0]", "3": "[0.5, 0.5]"}.items():
+        conn.execute("UPDATE vorgang SET embedding_json = ? WHERE vorgang_id = ?", (vec, vid))
+
+    items = load_embeddings(conn)
+    rows = filter_rows(conn, items, ressort="B")
+    ranked = rank_by_similarity([1.0, 0.0], items, limit=5, rows=rows)
+    assert [vid for vid, _, _ in ranked] == ["3", "2"]
+
+
+def test_load_embeddings_reads_packed_and_json_vectors(tmp_path: Path) -> None:
+    conn = connect(DbConfig(path=tmp_path / "test.sqlite"))
+    init_db(conn)
+    upsert_vorgang_many(
+        conn, [normalize_vorgang({"id": vid, "vorgangstyp": "Kleine Anfrage"}) for vid in "12"]
+    )
+    conn.execute(
+        "UPDATE vorgang SET embedding_json = ? WHERE vorgang_id = '1'",
+        (pack_embedding([0.0, 2.0]),),
+    )
+    conn.execute("UPDATE vorgang SET embedding_json = '[3.0, 0.0]' WHERE vorgang_id = '2'")
+
+    items = load_embeddings(conn)
+    assert rank_by_similarity([0.0, 1.0], items, limit=1)[0][:2] == ("1", pytest.approx(1.0))
+    assert rank_by_similarity([1.0, 0.0], items, limit=1)[0][:2] == ("2", pytest.approx(1.0))
+
+
+def test_int8_embeddings_rank_like_float32(tmp_path: Path) -> None:
+    import numpy as np
+
+    conn = connect(DbConfig(path=tmp_path / "test.sqlite"))
+    init_db(conn)
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((50, 16)).astype(np.float32)
+    upsert_vorgang_many(
+        conn,
+        [normalize_vorgang({"id": str(i), "vorgangstyp": "Kleine Anfrage"}) for i in range(50)],
+    )
+    for i, vec in enumerate(vectors):
+        conn.execute(
+            "UPDATE vorgang SET embedding_json = ? WHERE vorgang_id = ?",
+            (pack_embedding(vec), str(i)),
+        )
+
+    exact = rank_by_similarity(vectors[7], load_embeddings(conn), limit=5)
+    quantized = rank_by_similarity(vectors[7], load_embeddings(conn, int8=True), limit=5)
+    assert quantized[0][0] == "7"
+    for (_, want, _), (_, got, _) in zip(exact, quantized):
+        assert got == pytest.approx(want, abs=0.02)
+
+
+@pytest.mark.parametrize("flags", [["--half", "--int8"], ["--ann", "--ressort", "Inneres"]])
+def test_search_vorgang_rejects_conflicting_flags(tmp_path: Path, flags) -> None:
+    db_path = str(tmp_path / "test.sqlite")
+    with pytest.raises(SystemExit) as exc:
+        main(["search-vorgang", "Windkraft", "--db-path", db_path, *flags])
+    assert exc.value.code != 0